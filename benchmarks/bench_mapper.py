@@ -0,0 +1,347 @@
+"""
+Replay benchmark for the HID -> Mapper -> EmulateX360 pipeline.
+
+Feeds synthetic (or recorded) reports for each profile in profiles/*.json
+through Mapper.handle_hid_data() with a counting null pad, then replays the
+resulting emulator calls through EmulateX360.update() alone. Runs headless:
+the virtual pad is a null backend, and pyautogui and keyboard are replaced
+by stubs when not importable.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_mapper
+    python -m benchmarks.bench_mapper --reports 50000 --profile DualSense
+    python -m benchmarks.bench_mapper --profile Dualshock4 --recording ds4.hex
+
+A recording is a text file with one hex-encoded report per line.
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+
+from core.virtual_pad import NullBackend
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# -----------------------------------------------------------------------------
+# Headless stubs
+# -----------------------------------------------------------------------------
+
+class CountingPad(NullBackend):
+    """
+    Null virtual pad that counts submitted updates.
+    """
+
+    name = "counting"
+
+    def __init__(self):
+        self.updates = 0
+
+    def update(self):
+        self.updates += 1
+
+
+def _install_stubs():
+    """
+    Make core.mapper importable without its desktop-only dependencies.
+    Real modules are used when they import.
+    """
+    def missing(name):
+        try:
+            __import__(name)
+            return False
+        except Exception:
+            return True
+
+    if missing("pyautogui"):
+        gui = types.ModuleType("pyautogui")
+        gui.moveTo = gui.moveRel = gui.click = lambda *a, **k: None
+        sys.modules["pyautogui"] = gui
+
+    if missing("keyboard"):
+        kb = types.ModuleType("keyboard")
+        kb.send = lambda *a, **k: None
+        sys.modules["keyboard"] = kb
+
+
+class _Page:
+    """
+    Minimal stand-in for the controllers / hotkey pages Mapper registers with.
+    """
+
+    def __init__(self, hotkey=None):
+        self.hotkey = hotkey
+
+    def add_x360_instance(self, emulator):
+        pass
+
+
+class _Settings:
+    """
+    Fixed settings: no mouse mode, default deadzones, linear sticks.
+    """
+
+    def __init__(self):
+        from core.settings import SettingsSnapshot
+        self._snapshot = SettingsSnapshot(
+            0,
+            (0.1, 0.1),
+            ((False, False), (False, False)),
+            ("linear", "linear"),
+            False,
+            False,
+            1.0,
+        )
+
+    def snapshot(self):
+        return self._snapshot
+
+
+class _Controller:
+    def __init__(self, name):
+        self.name = name
+        self.device_path = f"bench/{name}".encode()
+
+
+# -----------------------------------------------------------------------------
+# Report generation
+# -----------------------------------------------------------------------------
+
+def synthetic_reports(config: dict, count: int, idle_ratio: float, seed: int = 1) -> list:
+    """
+    Generate reports for a profile: circling sticks, ramping triggers,
+    occasional button taps / D-pad presses, and `idle_ratio` repeated reports
+    (a pad at rest still reports at its full rate).
+    """
+    from core.profile_decoder import AXIS_ORDER, BUTTON_ORDER, ProfileDecoder, _parse_int, _parse_mask
+
+    rng = random.Random(seed)
+    length = max(64, ProfileDecoder(config).min_length)
+    axes = config.get("axes", {}) or {}
+    buttons = config.get("buttons", {}) or {}
+    hat = config.get("dpad_hat") or {}
+
+    axis_bytes = [_parse_int((axes.get(name) or {}).get("byte")) for name in AXIS_ORDER]
+    button_fields = []
+    for name in BUTTON_ORDER:
+        cfg = buttons.get(name) or {}
+        idx = _parse_int(cfg.get("index", cfg.get("byte")))
+        if idx is not None:
+            button_fields.append((idx, _parse_mask(cfg.get("mask"), 0xFF)))
+    hat_byte = _parse_int(hat.get("byte"))
+
+    report = bytearray(length)
+    for idx in axis_bytes[:4]:
+        if idx is not None:
+            report[idx] = 128
+    if hat_byte is not None:
+        report[hat_byte] |= 0x08  # neutral
+
+    reports = []
+    held, release_at = None, 0
+    for i in range(count):
+        if reports and rng.random() < idle_ratio:
+            reports.append(reports[-1])
+            continue
+
+        angle = i / 25.0
+        values = (
+            128 + int(100 * math.cos(angle)),
+            128 + int(100 * math.sin(angle)),
+            128 + int(60 * math.cos(angle * 0.5)),
+            128 + int(60 * math.sin(angle * 0.5)),
+            (i * 3) & 0xFF,
+            (i * 5) & 0xFF,
+        )
+        for idx, value in zip(axis_bytes, values):
+            if idx is not None:
+                report[idx] = value
+
+        # one button tapped at a time, held for a few reports (no chords, so
+        # the BACK+R3 mouse-mode toggle never fires)
+        if held is not None and i >= release_at:
+            idx, mask = held
+            report[idx] &= ~mask & 0xFF
+            held = None
+        if held is None and button_fields and rng.random() < 0.05:
+            held = rng.choice(button_fields)
+            release_at = i + rng.randint(5, 40)
+            idx, mask = held
+            report[idx] |= mask
+        if hat_byte is not None and rng.random() < 0.02:
+            report[hat_byte] = (report[hat_byte] & 0xF0) | rng.choice((0, 2, 4, 6, 8))
+
+        reports.append(bytes(report))
+    return reports
+
+
+def load_recording(path: str) -> list:
+    with open(path, "r") as f:
+        return [bytes.fromhex(line.strip()) for line in f if line.strip()]
+
+
+# -----------------------------------------------------------------------------
+# Measurement
+# -----------------------------------------------------------------------------
+
+def _percentile(sorted_ns: list, pct: float) -> float:
+    if not sorted_ns:
+        return 0.0
+    k = min(len(sorted_ns) - 1, int(round(pct / 100.0 * (len(sorted_ns) - 1))))
+    return sorted_ns[k] / 1000.0
+
+
+def measure(fn, items: list) -> dict:
+    """
+    Call fn(item) for every item: once timed, once under tracemalloc.
+    """
+    perf = time.perf_counter_ns
+    latencies = []
+    append = latencies.append
+
+    start = perf()
+    for item in items:
+        t0 = perf()
+        fn(item)
+        append(perf() - t0)
+    total_ns = perf() - start
+
+    # Allocation pass: bytes allocated while handling each report
+    # (peak over the call minus the size before it), and net blocks left
+    # behind overall.
+    tracemalloc.start()
+    allocated = 0
+    blocks_before = sys.getallocatedblocks()
+    for item in items:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        fn(item)
+        allocated += tracemalloc.get_traced_memory()[1] - before
+    blocks_after = sys.getallocatedblocks()
+    tracemalloc.stop()
+
+    latencies.sort()
+    n = len(items) or 1
+    return {
+        "count": len(items),
+        "per_sec": len(items) / (total_ns / 1e9) if total_ns else 0.0,
+        "p50": _percentile(latencies, 50),
+        "p90": _percentile(latencies, 90),
+        "p99": _percentile(latencies, 99),
+        "max": latencies[-1] / 1000.0 if latencies else 0.0,
+        "bytes": allocated / n,
+        "blocks": (blocks_after - blocks_before) / n,
+    }
+
+
+def bench_profile(name: str, reports: list, hotkey) -> list:
+    from core.emulator import EmulateX360
+    from core.mapper import Mapper
+
+    pad = CountingPad()
+    mapper = Mapper(
+        _Controller(name), name, "x360", _Settings(),
+        _Page(), _Page(hotkey), backend=pad,
+    )
+    mapper.start()
+    emulator = mapper.emulator
+
+    # Warm-up pass: prime tables and capture the emulator calls for the
+    # update()-only replay below.
+    calls = []
+    real_update = emulator.update
+    emulator.update = lambda *args: (calls.append(args), real_update(*args))
+    for report in reports:
+        mapper.handle_hid_data(report)
+    del emulator.update
+
+    mapper.reports_processed = mapper.reports_skipped = 0
+    pad.updates = 0
+
+    handle = mapper.handle_hid_data
+    pipeline = measure(handle, reports)
+    pipeline["skipped"] = mapper.reports_skipped / (2 * len(reports) or 1)
+    pipeline["pad_updates"] = pad.updates / (2 * len(reports) or 1)
+
+    update = EmulateX360.update
+    emulator._forget_state()
+    update_only = measure(lambda args: update(emulator, *args), calls)
+    update_only["skipped"] = None
+    update_only["pad_updates"] = None
+
+    mapper.stop()
+    return [(f"{name} mapper", pipeline), (f"{name} update", update_only)]
+
+
+def _print_table(rows: list) -> None:
+    header = (
+        f"{'stage':<22}{'reports':>9}{'rep/s':>11}{'p50us':>8}{'p90us':>8}"
+        f"{'p99us':>8}{'maxus':>9}{'B/rep':>8}{'blk/rep':>9}{'skip%':>7}{'upd/rep':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+    for label, r in rows:
+        skip = "-" if r["skipped"] is None else f"{100 * r['skipped']:.1f}"
+        upd = "-" if r["pad_updates"] is None else f"{r['pad_updates']:.2f}"
+        print(
+            f"{label:<22}{r['count']:>9}{r['per_sec']:>11.0f}{r['p50']:>8.1f}{r['p90']:>8.1f}"
+            f"{r['p99']:>8.1f}{r['max']:>9.1f}{r['bytes']:>8.0f}{r['blocks']:>9.3f}{skip:>7}{upd:>8}"
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--reports", type=int, default=20000, help="synthetic reports per profile")
+    parser.add_argument("--idle-ratio", type=float, default=0.5, help="fraction of repeated reports")
+    parser.add_argument("--profile", action="append", help="profile name (default: all in profiles/)")
+    parser.add_argument("--recording", help="hex report file to replay instead of synthetic input")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    _install_stubs()
+
+    from core.utils.hotkeys import Hotkey
+
+    names = args.profile or sorted(
+        f[:-5] for f in os.listdir("profiles") if f.endswith(".json")
+    )
+    if args.recording and len(names) != 1:
+        parser.error("--recording needs exactly one --profile")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        hotkey_file = os.path.join(tmp, "hotkeys.json")
+        with open(hotkey_file, "w") as f:
+            json.dump({}, f)
+        hotkey = Hotkey(hotkey_file)
+
+        rows = []
+        for name in names:
+            try:
+                with open(f"profiles/{name}.json", "r") as f:
+                    config = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"[bench] Skipping profile {name}: {e}")
+                continue
+
+            if args.recording:
+                reports = load_recording(args.recording)
+            else:
+                reports = synthetic_reports(config, args.reports, args.idle_ratio, args.seed)
+            rows.extend(bench_profile(name, reports, hotkey))
+
+    _print_table(rows)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
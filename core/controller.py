@@ -5,6 +5,22 @@ class PlayerType:
     def __repr__(self):
         return self.type
 
+# (vendor_id, product_id) -> controller profile (profiles/<name>.json)
+CONTROLLER_TYPES = {
+    (0x054C, 0x05C4): "Dualshock4",
+    (0x054C, 0x09CC): "Dualshock4",
+    (0x054C, 0x0CE6): "DualSense",
+    (0x10C4, 0x82C0): "Unojoy",
+}
+
+
+def controller_type(vendor_id, product_id) -> str:
+    """
+    Return the profile name for a controller, "Generic" if unsupported.
+    """
+    return CONTROLLER_TYPES.get((vendor_id, product_id), "Generic")
+
+
 class Controller:
     """
     Represents a physical controller.
@@ -0,0 +1,221 @@
+"""
+Headless daemon: maps the controllers and runs the remote gamepad server
+configured in the [headless] section of config/settings.conf, without
+loading Qt.
+
+    python -m core.daemon [--config PATH] [--pad-backend NAME]
+    python main.py --headless [same options]
+
+Every device gets an HIDReader thread that feeds its Mapper directly
+(direct pipeline mode); the server runs on its own asyncio thread, and
+every client that authenticates is emulated (there is no operator to
+switch clients on). Pairing codes are printed to stdout. Mappings are
+fixed at startup: restart to pick up config changes or new devices.
+SIGINT/SIGTERM stop the daemon, SIGUSR1 prints input latency percentiles.
+"""
+
+import argparse
+import signal
+import threading
+from typing import Dict, List, Optional
+
+import hid
+
+from core import latency
+from core.controller import CONTROLLER_TYPES, Controller, controller_type
+from core.emulator import EmulatorRegistry
+from core.hid_reader import HIDReader
+from core.mapper import Mapper, Phone_mapper
+from core.remote_server import (
+    HOST, EVENT_AUTH_CODE, EVENT_CONNECTED, EVENT_DISCONNECTED, EVENT_TRUSTED_ADDED,
+    RemoteGamepadServer,
+)
+from core.settings import SettingsManager
+from core.utils.hotkeys import Hotkey
+from core.virtual_pad import BACKENDS, DEFAULT_BACKEND
+
+
+class MapperReader(HIDReader):
+    """
+    HIDReader that feeds one Mapper on its own thread.
+    """
+
+    def __init__(self, controller: Controller, mapper: Mapper, settings: SettingsManager):
+        super().__init__(
+            controller,
+            settings.get_polling_rate() / 1000,
+            coalesce=settings.get_coalesce_reports(),
+        )
+        self.mapper = mapper
+        self.direct_handler = mapper.handle_hid_data
+        self.edge_key = mapper.decoder.button_state
+        self.thread = threading.Thread(target=self.run, name=f"HIDReader-{controller.name}", daemon=True)
+
+    def _emit_error(self, message: str):
+        self.mapper.handle_error(message)
+
+
+class HeadlessDaemon:
+    def __init__(self, settings: SettingsManager, hotkey: Hotkey, backend: Optional[str] = None):
+        self.settings = settings
+        self.registry = EmulatorRegistry(hotkey)
+        self.backend = backend
+        self.readers: Dict[object, MapperReader] = {}  # device_path -> reader
+        self.server: Optional[RemoteGamepadServer] = None
+        self._stopped = threading.Event()
+
+    # -------------------------------------------------------------------------
+    # Devices
+    # -------------------------------------------------------------------------
+
+    def select_devices(self) -> List[dict]:
+        """
+        hid.enumerate() entries matching [headless] devices.
+        """
+        wanted = self.settings.get_headless_devices()
+        if wanted is None:
+            wanted = CONTROLLER_TYPES
+        selected = []
+        paths = set()
+        for dev in hid.enumerate():
+            if (dev.get("vendor_id"), dev.get("product_id")) not in wanted:
+                continue
+            if dev["path"] in paths:
+                continue
+            paths.add(dev["path"])
+            selected.append(dev)
+        return selected
+
+    def start_devices(self) -> None:
+        backend = self.settings.get_input_backend()
+        if backend != "hidapi":
+            print(f"[Daemon] input_backend={backend} needs the GUI; using hidapi reader threads")
+
+        for dev in self.select_devices():
+            path = dev["path"]
+            if path in self.readers:
+                continue
+            vid, pid = dev["vendor_id"], dev["product_id"]
+            controller = Controller(vid, pid, path, dev.get("product_string") or None)
+            profile = controller_type(vid, pid)
+            try:
+                mapper = Mapper(
+                    controller, profile, "x360", self.settings,
+                    self.registry, self.registry, backend=self.backend,
+                )
+            except Exception as e:
+                print(f"[Daemon] Could not map {controller}: {e}")
+                continue
+
+            reader = MapperReader(controller, mapper, self.settings)
+            self.readers[path] = reader
+            mapper.start()
+            reader.thread.start()
+            print(f"[Daemon] Mapping {controller} with profile {profile}")
+
+        if not self.readers:
+            print("[Daemon] No controllers to map")
+
+    # -------------------------------------------------------------------------
+    # Remote server
+    # -------------------------------------------------------------------------
+
+    def start_server(self) -> None:
+        """
+        :raises OSError: If the server could not listen.
+        """
+        port = self.settings.get_headless_server_port()
+        self.server = RemoteGamepadServer(
+            HOST,
+            port,
+            mapper_factory=self._make_phone_mapper,
+            on_events=self._on_server_events,
+            udp_port=port,
+        )
+        self.server.start()
+        print(f"[Daemon] Remote gamepad server listening on {HOST}:{port}")
+
+    def _make_phone_mapper(self, uuid: str) -> Phone_mapper:
+        return Phone_mapper(uuid, "x360", self.registry, self.registry, self.settings, backend=self.backend)
+
+    def _on_server_events(self, events: List[tuple]) -> None:
+        for kind, *args in events:
+            if kind == EVENT_CONNECTED:
+                self.server.set_emulating(args[0], True)
+                print(f"[Daemon] Client connected: {args[0]}")
+            elif kind == EVENT_DISCONNECTED:
+                print(f"[Daemon] Client disconnected: {args[0]}")
+            elif kind == EVENT_AUTH_CODE:
+                addr, code, time_left = args
+                # sent again every second while it counts down; print once
+                if code and time_left == self.server.auth_timeout:
+                    print(f"[Daemon] Pairing code for {addr}: {code} (valid {time_left}s)")
+            elif kind == EVENT_TRUSTED_ADDED:
+                print(f"[Daemon] Trusted new client: {args[0]}")
+
+    # -------------------------------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------------------------------
+
+    def run(self, devices: bool = True, server: bool = True) -> int:
+        """
+        Start everything and block until stop() or SIGINT/SIGTERM.
+        """
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda signum, frame: self.stop())
+        latency.install_dump_signal()
+
+        try:
+            if devices:
+                self.start_devices()
+            if server and self.settings.get_headless_server():
+                try:
+                    self.start_server()
+                except OSError as e:
+                    print(f"[Daemon] Could not start the remote gamepad server: {e}")
+                    return 1
+
+            # short waits so signal handlers run promptly on this thread
+            while not self._stopped.wait(0.5):
+                pass
+        finally:
+            self.shutdown()
+        return 0
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def shutdown(self) -> None:
+        if self.server is not None:
+            self.server.stop()
+            self.server = None
+
+        # stop the readers before the mappers, so no report is still being
+        # mapped while an emulator shuts down
+        for reader in self.readers.values():
+            reader.stop()
+        for reader in self.readers.values():
+            reader.thread.join(1.0)
+            reader.mapper.stop()
+        self.readers.clear()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Universal Remapper without the GUI")
+    parser.add_argument("--config", default="config/settings.conf", help="settings file")
+    parser.add_argument("--hotkeys", default="hotkeys.json", help="hotkey bindings file")
+    parser.add_argument(
+        "--pad-backend", default=DEFAULT_BACKEND, choices=sorted(BACKENDS),
+        help="virtual pad backend",
+    )
+    parser.add_argument("--no-devices", action="store_true", help="do not map local controllers")
+    parser.add_argument("--no-server", action="store_true", help="do not start the remote gamepad server")
+    args = parser.parse_args(argv)
+
+    settings = SettingsManager(args.config)
+    daemon = HeadlessDaemon(settings, Hotkey(args.hotkeys), backend=args.pad_backend)
+    return daemon.run(devices=not args.no_devices, server=not args.no_server)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,8 +1,15 @@
-import vgamepad as vg
 import time
+from core import latency
 from core.utils.controller_monitor import controllerMonitor
 from core.utils.hotkeys import Hotkey
-from core.utils.hotkey_commander import HotkeyCommander
+from core.utils.hotkey_commander import HotkeyCommander, HotkeyExecutor
+from core.virtual_pad import (
+    create_backend,
+    XUSB_DPAD_UP, XUSB_DPAD_DOWN, XUSB_DPAD_LEFT, XUSB_DPAD_RIGHT,
+    XUSB_START, XUSB_BACK, XUSB_LEFT_THUMB, XUSB_RIGHT_THUMB,
+    XUSB_LEFT_SHOULDER, XUSB_RIGHT_SHOULDER,
+    XUSB_A, XUSB_B, XUSB_X, XUSB_Y, XUSB_ALL_MASK,
+)
 
 
 media_functions = {
@@ -19,32 +26,101 @@ class ListOfAllControllers:
     controllers_path = []
     controllers_name = []
 
+
+class EmulatorRegistry:
+    """
+    What mappers register their emulators with, in place of the Controllers
+    or Hotkeys page (see Mapper). Keeps every instance by device_path and
+    forwards it to the attached pages; a page attached later gets the
+    earlier ones replayed, so pages can be built on demand.
+    """
+
+    def __init__(self, hotkey):
+        self.hotkey = hotkey
+        self.x360_instances = {}
+        self._pages = []
+
+    def add_x360_instance(self, instance) -> None:
+        self._forget_shut_down()
+        if hasattr(instance, "device_path"):
+            self.x360_instances[instance.device_path] = instance
+        for page in self._pages:
+            page.add_x360_instance(instance)
+
+    def attach(self, page) -> None:
+        self._forget_shut_down()
+        self._pages.append(page)
+        for instance in self.x360_instances.values():
+            page.add_x360_instance(instance)
+
+    def _forget_shut_down(self) -> None:
+        # emulators remove themselves from ListOfAllControllers on shutdown
+        active = ListOfAllControllers.controllers_path
+        for path in [path for path in self.x360_instances if path not in active]:
+            del self.x360_instances[path]
+
+
 class EmulateX360:
-    def __init__(self, device_path, controller_name, hotkey):
+    # virtual pad creation: attempts are made from update(), at most one per
+    # interval, and given up after MAX_INSTANTIATE_ATTEMPTS
+    INSTANTIATE_RETRY_INTERVAL = 0.2
+    MAX_INSTANTIATE_ATTEMPTS = 25
+
+    def __init__(self, device_path, controller_name, hotkey, backend=None):
         self.device_path = device_path
         self.controller_name = controller_name
         self.hotkey = hotkey
         self.hotkey_commander = HotkeyCommander(media_functions, custom_commands)
+        # hotkey actions run here, never on the input path
+        self.hotkey_executor = HotkeyExecutor(self.hotkey_commander)
         ListOfAllControllers.controllers_path.append(device_path)
         ListOfAllControllers.controllers_name.append(controller_name)
         self.is_monitoring = False
         self.could_instantiate = False
+        self.v_x360 = create_backend(backend)
+        self._instantiate_attempts = 0
+        self._next_instantiate = 0.0
+        # set by the owning mapper (core.latency.DeviceTrace)
+        self.trace = None
+
+        # last state submitted to the virtual pad (None = unknown, resend)
+        self._last_buttons = None
+        self._last_triggers = None
+        self._last_left = None
+        self._last_right = None
 
         # debounce state for hotkeys
         self._last_hotkey_func = None
         self._last_hotkey_time = 0.0
         self._hotkey_interval = 0.1  # 200 ms
 
-        while self.could_instantiate is False:
-            self.instantiate_vg()
-            time.sleep(0.2)
+        self.instantiate_vg()
+
+    @property
+    def hotkey_held(self):
+        """
+        True while a hotkey combo is held (and may still auto-repeat).
+        """
+        return self._last_hotkey_func is not None
 
     def instantiate_vg(self):
+        """
+        Make one attempt to open the virtual pad backend. Never blocks;
+        update() calls this again until it succeeds or attempts run out.
+        """
+        if self.could_instantiate or self._instantiate_attempts >= self.MAX_INSTANTIATE_ATTEMPTS:
+            return self.could_instantiate
+
+        self._instantiate_attempts += 1
+        self._next_instantiate = time.monotonic() + self.INSTANTIATE_RETRY_INTERVAL
         try:
-            self.v_x360 = vg.VX360Gamepad()
+            self.v_x360.open()
             self.could_instantiate = True
-        except AssertionError as A:
-            print(A)
+            self._forget_state()
+        except Exception as e:
+            print(f"[EmulateX360] Could not create {self.v_x360.name} pad "
+                  f"(attempt {self._instantiate_attempts}/{self.MAX_INSTANTIATE_ATTEMPTS}): {e}")
+        return self.could_instantiate
 
     def _maybe_do_hotkey(self, ok, func):
         """
@@ -64,14 +140,14 @@ class EmulateX360:
             self._last_hotkey_func = func
             self._last_hotkey_time = now
             if func in media_functions.keys():
-                self.hotkey_commander.do(func, False)
+                self.hotkey_executor.submit(func, False)
             return
 
         # same hotkey as last time -> check debounce timer
         if now - self._last_hotkey_time >= self._hotkey_interval:
             self._last_hotkey_time = now
             if func in media_functions.keys():
-                self.hotkey_commander.do(func, False)
+                self.hotkey_executor.submit(func, False)
 
     def update(self, ljx, ljy, rjx, rjy, a=False, x=False, b=False, y=False,
                rb=False, rt=0, lb=False, lt=0, dpu=False, dpd=False, dpr=False, dpl=False,
@@ -91,80 +167,115 @@ class EmulateX360:
             self._last_monitor = data
             return data
         
-        binary, rt, lt, jlx, jly, jrx, jry = controllerMonitor.monitor(
+        mask = controllerMonitor.button_mask(
             a, b, y, x,
             start, back,
             r3, l3,
             dpu, dpd, dpr, dpl,
             rb, lb,
-            rt, lt,
-            ljx, ljy,
-            rjx, rjy
         )
 
-        ok, func, msg = self.hotkey.get_hotkey(binary)
+        trace = self.trace
+        if trace is not None and not trace.enabled:
+            trace = None
+        if trace is not None:
+            t0 = time.perf_counter_ns()
+
+        ok, func, msg = self.hotkey.get_hotkey(mask)
 
         # debounced hotkey execution
         self._maybe_do_hotkey(ok, func)
 
-        # Joysticks
-        self.v_x360.left_joystick(x_value=int(ljx), y_value=int(ljy))
-        self.v_x360.right_joystick(x_value=int(rjx), y_value=int(rjy))
+        if trace is not None:
+            trace.record(latency.STAGE_HOTKEY, time.perf_counter_ns() - t0)
 
-        # Triggers
-        self.v_x360.left_trigger(value=int(lt))
-        self.v_x360.right_trigger(value=int(rt))
+        if not self.could_instantiate:
+            if time.monotonic() < self._next_instantiate or not self.instantiate_vg():
+                return
 
-        # Face Buttons
-        self._press_release(a, vg.XUSB_BUTTON.XUSB_GAMEPAD_A)
-        self._press_release(b, vg.XUSB_BUTTON.XUSB_GAMEPAD_B)
-        self._press_release(x, vg.XUSB_BUTTON.XUSB_GAMEPAD_X)
-        self._press_release(y, vg.XUSB_BUTTON.XUSB_GAMEPAD_Y)
-        
-        # Shoulders
-        self._press_release(lb, vg.XUSB_BUTTON.XUSB_GAMEPAD_LEFT_SHOULDER)
-        self._press_release(rb, vg.XUSB_BUTTON.XUSB_GAMEPAD_RIGHT_SHOULDER)
+        buttons = (
+            (XUSB_A if a else 0)
+            | (XUSB_B if b else 0)
+            | (XUSB_X if x else 0)
+            | (XUSB_Y if y else 0)
+            | (XUSB_LEFT_SHOULDER if lb else 0)
+            | (XUSB_RIGHT_SHOULDER if rb else 0)
+            | (XUSB_BACK if back else 0)
+            | (XUSB_START if start else 0)
+            | (XUSB_LEFT_THUMB if l3 else 0)
+            | (XUSB_RIGHT_THUMB if r3 else 0)
+            | (XUSB_DPAD_UP if dpu else 0)
+            | (XUSB_DPAD_DOWN if dpd else 0)
+            | (XUSB_DPAD_LEFT if dpl else 0)
+            | (XUSB_DPAD_RIGHT if dpr else 0)
+        )
+        triggers = (int(lt), int(rt))
+        left = (int(ljx), int(ljy))
+        right = (int(rjx), int(rjy))
 
-        # Menu / Stick Clicks
-        self._press_release(back, vg.XUSB_BUTTON.XUSB_GAMEPAD_BACK)
-        self._press_release(start, vg.XUSB_BUTTON.XUSB_GAMEPAD_START)
-        self._press_release(l3, vg.XUSB_BUTTON.XUSB_GAMEPAD_LEFT_THUMB)
-        self._press_release(r3, vg.XUSB_BUTTON.XUSB_GAMEPAD_RIGHT_THUMB)
+        # Only touch what changed since the last submitted report
+        dirty = False
 
-        # DPad simulation
-        self._set_dpad(dpu, dpd, dpl, dpr)
+        if left != self._last_left:
+            self.v_x360.left_joystick(x_value=left[0], y_value=left[1])
+            self._last_left = left
+            dirty = True
+        if right != self._last_right:
+            self.v_x360.right_joystick(x_value=right[0], y_value=right[1])
+            self._last_right = right
+            dirty = True
 
-        self.v_x360.update()
+        if triggers != self._last_triggers:
+            self.v_x360.left_trigger(value=triggers[0])
+            self.v_x360.right_trigger(value=triggers[1])
+            self._last_triggers = triggers
+            dirty = True
 
-    def _press_release(self, pressed, button):
-        if pressed:
-            self.v_x360.press_button(button=button)
+        last_buttons = self._last_buttons
+        if last_buttons is None:
+            # unknown pad state: set every button explicitly once
+            changed = XUSB_ALL_MASK
         else:
-            self.v_x360.release_button(button=button)
-
-    def _set_dpad(self, up, down, left, right):
-        # Reset all D-pad buttons first
-        self.v_x360.release_button(vg.XUSB_BUTTON.XUSB_GAMEPAD_DPAD_UP)
-        self.v_x360.release_button(vg.XUSB_BUTTON.XUSB_GAMEPAD_DPAD_DOWN)
-        self.v_x360.release_button(vg.XUSB_BUTTON.XUSB_GAMEPAD_DPAD_LEFT)
-        self.v_x360.release_button(vg.XUSB_BUTTON.XUSB_GAMEPAD_DPAD_RIGHT)
-
-        # Press based on state (allowing diagonals)
-        if up:
-            self.v_x360.press_button(vg.XUSB_BUTTON.XUSB_GAMEPAD_DPAD_UP)
-        if down:
-            self.v_x360.press_button(vg.XUSB_BUTTON.XUSB_GAMEPAD_DPAD_DOWN)
-        if left:
-            self.v_x360.press_button(vg.XUSB_BUTTON.XUSB_GAMEPAD_DPAD_LEFT)
-        if right:
-            self.v_x360.press_button(vg.XUSB_BUTTON.XUSB_GAMEPAD_DPAD_RIGHT)
+            changed = buttons ^ last_buttons
+        if changed:
+            while changed:
+                bit = changed & -changed
+                changed ^= bit
+                if buttons & bit:
+                    self.v_x360.press_button(bit)
+                else:
+                    self.v_x360.release_button(bit)
+            self._last_buttons = buttons
+            dirty = True
+
+        if dirty:
+            if trace is None:
+                self.v_x360.update()
+            else:
+                t0 = time.perf_counter_ns()
+                self.v_x360.update()
+                trace.record(latency.STAGE_PAD, time.perf_counter_ns() - t0)
+
+    def _forget_state(self):
+        """
+        Force the next update() to resend the full state.
+        """
+        self._last_buttons = None
+        self._last_triggers = None
+        self._last_left = None
+        self._last_right = None
 
     def shutdown(self):
-        try:
-            self.v_x360.reset()
-            self.v_x360.update()
-        except Exception as e:
-            print(f"[EmulateX360] Error on shutdown: {e}")
+        if self.could_instantiate:
+            try:
+                self.v_x360.reset()
+                self.v_x360.update()
+                self.v_x360.close()
+            except Exception as e:
+                print(f"[EmulateX360] Error on shutdown: {e}")
+        self.could_instantiate = False
+        self._forget_state()
+        self.hotkey_executor.shutdown()
 
         # Remove from tracking lists
         try:
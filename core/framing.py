@@ -0,0 +1,84 @@
+from typing import Dict, List, Optional
+
+
+class LineTooLong(ValueError):
+    """
+    Raised by LineFramer when a line exceeds its max_line.
+    """
+
+
+class LineFramer:
+    """
+    Splits a byte stream into newline-terminated lines.
+
+    Received bytes are appended to one bytearray. Each feed() scans only
+    the new bytes for newlines, copies each complete line out once and
+    compacts the buffer once, so framing cost is linear in the bytes
+    received however the stream is chunked. Lines are returned as bytes,
+    without the newline, and are never decoded here.
+
+    `fixed` maps a first byte to a message size: a message starting with
+    one of those bytes is returned after exactly that many bytes, newline
+    or not (binary frames sharing the stream with JSON lines).
+    """
+
+    def __init__(self, max_line: int = 4096, fixed: Optional[Dict[int, int]] = None):
+        self.max_line = max_line
+        self.fixed: Dict[int, int] = dict(fixed or {})
+        self._buf = bytearray()
+        self._scanned = 0  # bytes at the start of _buf known to hold no newline
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """
+        Add received bytes and return the lines they completed.
+
+        :raises LineTooLong: If a line (complete or still buffered) is
+            longer than max_line. The framer is reset; the caller should
+            drop the connection.
+        """
+        buf = self._buf
+        buf += data
+
+        lines = []
+        start = 0
+        pos = self._scanned
+        max_line = self.max_line
+        fixed = self.fixed
+        end = len(buf)
+
+        with memoryview(buf) as view:
+            while True:
+                if fixed and start < end and pos == start:
+                    size = fixed.get(buf[start])
+                    if size is not None:
+                        if start + size > end:
+                            break
+                        lines.append(bytes(view[start:start + size]))
+                        start = pos = start + size
+                        continue
+                nl = buf.find(b"\n", pos)
+                if nl < 0:
+                    break
+                if nl - start > max_line:
+                    self.reset()
+                    raise LineTooLong(f"Line of {nl - start} bytes exceeds {max_line}")
+                lines.append(bytes(view[start:nl]))
+                start = pos = nl + 1
+
+        if start:
+            del buf[:start]
+        if len(buf) > max_line:
+            size = len(buf)
+            self.reset()
+            raise LineTooLong(f"Unterminated line of {size} bytes exceeds {max_line}")
+        # a pending fixed-size message is rechecked from its first byte
+        self._scanned = 0 if buf and buf[0] in fixed else len(buf)
+        return lines
+
+    def reset(self) -> None:
+        self._buf = bytearray()
+        self._scanned = 0
+
+    @property
+    def buffered(self) -> int:
+        return len(self._buf)
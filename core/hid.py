@@ -1,15 +1,31 @@
+import select
 from PySide6.QtCore import QObject, QThread
-from .hid_manager import HIDWorker
+from .hid_manager import HIDWorker, READ_MODE_BLOCKING
 import hid
 from core.controller import Controller
 
+
+# Input backends
+INPUT_HIDAPI = "hidapi"    # one QThread + HIDWorker per device (default)
+INPUT_HIDRAW = "hidraw"    # Linux: all /dev/hidraw* devices on one epoll thread
+INPUT_MULTIPLEX = "multiplex"  # all hid.device handles on one round-robin thread
+
+
 class HIDManager(QObject):
     """Manages multiple HID controllers with polling in QThreads."""
-    def __init__(self, poll_interval=0.008):
+    def __init__(self, poll_interval=0.008, read_mode=READ_MODE_BLOCKING, coalesce=False, direct=False,
+                 input_backend=INPUT_HIDAPI):
         super().__init__()
         self.poll_interval = poll_interval
+        self.read_mode = read_mode
+        self.coalesce = coalesce
+        # run on_data on the reader thread instead of the GUI thread
+        self.direct = direct
+        self.input_backend = input_backend
         self.devices = []
-        self._workers = {}  # device_path -> (thread, worker, controller)
+        self._workers = {}  # device_path -> (thread or None, worker, controller)
+        self._hidraw_reader = None
+        self._multiplex_reader = None
 
     def scan_devices(self):
         """Scan all connected HID devices."""
@@ -24,8 +40,15 @@ class HIDManager(QObject):
 
         controller = Controller(vendor_id, product_id, path, name)
 
+        if self.input_backend == INPUT_HIDRAW:
+            if hasattr(select, "epoll"):
+                return self._start_hidraw(controller, on_data, on_error)
+            print("[HIDManager] hidraw input needs Linux epoll; using a hidapi worker")
+        if self.input_backend == INPUT_MULTIPLEX:
+            return self._start_multiplex(controller, on_data, on_error)
+
         thread = QThread()
-        worker = HIDWorker(controller, self.poll_interval)
+        worker = HIDWorker(controller, self.poll_interval, self.read_mode, coalesce=self.coalesce)
         worker.moveToThread(thread)
 
         thread.started.connect(worker.run)
@@ -42,6 +65,99 @@ class HIDManager(QObject):
         self._workers[path] = (thread, worker, controller)
         return controller
 
+    def _start_hidraw(self, controller, on_data=None, on_error=None):
+        """
+        Service the device from the shared epoll reader instead of a QThread.
+        """
+        from .hidraw_reader import EpollHidrawReader, HidrawChannel
+
+        if self._hidraw_reader is None:
+            self._hidraw_reader = EpollHidrawReader()
+
+        channel = HidrawChannel(controller, self._hidraw_reader, coalesce=self.coalesce)
+        if on_data:
+            channel.data_received.connect(on_data)
+        if on_error:
+            channel.error.connect(on_error)
+
+        if self._hidraw_reader.add(channel):
+            self._workers[controller.device_path] = (None, channel, controller)
+        return controller
+
+    def _start_multiplex(self, controller, on_data=None, on_error=None):
+        """
+        Service the device from the shared round-robin reader instead of a QThread.
+        """
+        from .hid_multiplex import MultiplexChannel, MultiplexReader
+
+        if self._multiplex_reader is None:
+            self._multiplex_reader = MultiplexReader(self.poll_interval)
+
+        channel = MultiplexChannel(controller, self._multiplex_reader, coalesce=self.coalesce)
+        if on_data:
+            channel.data_received.connect(on_data)
+        if on_error:
+            channel.error.connect(on_error)
+
+        if self._multiplex_reader.add(channel):
+            self._workers[controller.device_path] = (None, channel, controller)
+        return controller
+
+    def device_stats(self):
+        """
+        Return {device_path: stats dict} for devices whose backend keeps
+        per-device stats (currently the multiplex backend).
+        """
+        return {
+            path: worker.stats()
+            for path, (_, worker, _) in self._workers.items()
+            if hasattr(worker, "stats")
+        }
+
+    def attach(self, device_path, on_data, on_error=None, edge_key=None) -> bool:
+        """
+        Route reports from a polled device to a consumer (usually a Mapper).
+
+        In direct mode on_data runs on the reader thread; otherwise it is
+        connected to the worker's queued data_received signal. on_error is
+        always a Qt signal connection.
+        """
+        wtuple = self._workers.get(device_path)
+        if not wtuple:
+            return False
+        _, worker, _ = wtuple
+
+        worker.edge_key = edge_key
+        # reports read while nobody was attached are not this consumer's
+        worker.trace.resync()
+        if self.direct:
+            worker.direct_handler = on_data
+        else:
+            worker.data_received.connect(on_data)
+        if on_error:
+            worker.error.connect(on_error)
+        return True
+
+    def detach(self, device_path, on_data, on_error=None):
+        """
+        Undo attach(). Safe to call for unknown or already stopped devices.
+        """
+        wtuple = self._workers.get(device_path)
+        if not wtuple:
+            return
+        _, worker, _ = wtuple
+
+        worker.direct_handler = None
+        try:
+            worker.data_received.disconnect(on_data)
+        except (RuntimeError, TypeError):
+            pass
+        if on_error:
+            try:
+                worker.error.disconnect(on_error)
+            except (RuntimeError, TypeError):
+                pass
+
     def stop_polling(self, device_path):
         if device_path not in self._workers:
             return
@@ -50,16 +166,25 @@ class HIDManager(QObject):
 
         worker.stop()
 
-        thread.quit()
-        thread.wait()
+        if thread is not None:
+            thread.quit()
+            thread.wait()
 
 
     def stop_all(self):
         for device_path, (thread, worker, controller) in list(self._workers.items()):
             worker.stop()
-            thread.quit()
-            thread.wait()
+            if thread is not None:
+                thread.quit()
+                thread.wait()
             self._workers.pop(device_path, None)
 
+        if self._hidraw_reader is not None:
+            self._hidraw_reader.close()
+            self._hidraw_reader = None
+        if self._multiplex_reader is not None:
+            self._multiplex_reader.close()
+            self._multiplex_reader = None
+
 
 hid_manager = HIDManager()
\ No newline at end of file
@@ -0,0 +1,301 @@
+import threading
+import time
+from collections import deque
+
+import hid
+
+from .hid_manager import HIDWorker
+
+
+class MultiplexChannel(HIDWorker):
+    """
+    One hid.device serviced by a MultiplexReader.
+
+    Exposes the same signals and attributes as HIDWorker, so HIDManager can
+    attach and detach consumers without knowing which backend is in use.
+    Reports are not delivered on the reader thread: _deliver() only pushes
+    them onto the reader's handoff queue.
+    """
+
+    def __init__(self, controller, reader, coalesce=False):
+        super().__init__(controller, coalesce=coalesce)
+        self.reader = reader
+        self.device = None
+        self._closed = threading.Event()
+
+        # per-device stats (written by the reader thread only)
+        self.reports = 0
+        self.empty_reads = 0
+        self.read_errors = 0
+        self.last_report_ns = 0
+        self.max_gap_ns = 0
+
+    def run(self):
+        raise RuntimeError("MultiplexChannel is driven by MultiplexReader")
+
+    def stop(self):
+        self._running = False
+        self.reader.remove(self)
+
+    def _deliver(self, report: bytes, read_ns: int = 0):
+        self.reader.handoff(self, report, read_ns)
+
+    def drain(self, size):
+        return self.device.read(size)
+
+    def stats(self) -> dict:
+        return {
+            "reports": self.reports,
+            "empty_reads": self.empty_reads,
+            "read_errors": self.read_errors,
+            "coalesced_reports": self.coalesced_reports,
+            "max_gap_ms": self.max_gap_ns / 1e6,
+        }
+
+
+class MultiplexReader:
+    """
+    Reads every open hid.device from one thread, round-robin.
+
+    Devices are non-blocking. Each pass reads at most one report per device
+    (plus up to MAX_DRAIN_PER_TURN pending ones in coalesce mode), starting
+    one device later every pass, so a chatty pad cannot starve the others.
+    When a full pass finds nothing the thread sleeps, starting at idle_sleep
+    and doubling up to IDLE_SLEEP_MAX while the devices stay quiet; with no
+    devices at all it waits until one is added.
+
+    Mapping runs on a separate dispatch thread. The reader hands reports
+    over through a deque (append/popleft are atomic), so a slow consumer
+    never holds up reads from the other devices and the hot path takes no
+    lock.
+    """
+
+    REPORT_SIZE = 65
+    MAX_DRAIN_PER_TURN = 8
+    IDLE_SLEEP_MIN = 0.0005
+    IDLE_SLEEP_MAX = 0.004
+
+    def __init__(self, idle_sleep=0.001):
+        self.idle_sleep = max(idle_sleep, self.IDLE_SLEEP_MIN)
+        self.idle_sleep_max = max(self.IDLE_SLEEP_MAX, self.idle_sleep)
+
+        self._channels = []
+        self._added = deque()
+        self._removed = deque()
+        self._changed = threading.Event()
+
+        self._queue = deque()
+        self._wake = threading.Event()
+        self._dispatching = None
+        self.max_backlog = 0
+
+        self._running = False
+        self._reader_thread = None
+        self._dispatch_thread = None
+
+    # -------------------------------------------------------------------------
+    # Device registration (any thread)
+    # -------------------------------------------------------------------------
+
+    def add(self, channel: MultiplexChannel) -> bool:
+        """
+        Open the channel's device and queue it for the reader. Failures are
+        reported through channel.error and return False.
+        """
+        device = hid.device()
+        try:
+            device.open_path(channel.controller.device_path)
+            device.get_feature_report(0x05, 65)     # feature report to make the controller give more data
+            device.set_nonblocking(1)
+        except Exception as e:
+            try:
+                device.close()
+            except Exception:
+                pass
+            channel.error.emit(f"Failed to open {channel.controller}: {e}")
+            channel.finished.emit()
+            return False
+
+        channel.device = device
+        self._added.append(channel)
+        self._changed.set()
+        self._start()
+        return True
+
+    def remove(self, channel: MultiplexChannel) -> None:
+        """
+        Stop servicing a channel. Returns once its device is closed and no
+        report for it is being dispatched. Safe to call twice.
+        """
+        if channel.device is None or channel._closed.is_set():
+            return
+        channel._running = False
+
+        if threading.current_thread() is self._reader_thread:
+            self._close_channel(channel)
+        else:
+            self._removed.append(channel)
+            self._changed.set()
+            channel._closed.wait(1.0)
+
+        # let an in-flight delivery to this channel finish
+        if threading.current_thread() is not self._dispatch_thread:
+            while self._dispatching is channel:
+                time.sleep(0.0005)
+
+    def close(self) -> None:
+        """
+        Remove every channel and stop both threads.
+        """
+        for channel in list(self._channels) + list(self._added):
+            self.remove(channel)
+
+        self._running = False
+        self._wake.set()
+        self._changed.set()
+        for thread in (self._reader_thread, self._dispatch_thread):
+            if thread is not None and thread is not threading.current_thread():
+                thread.join()
+        self._reader_thread = self._dispatch_thread = None
+
+    def handoff(self, channel: MultiplexChannel, report: bytes, read_ns: int = 0) -> None:
+        queue = self._queue
+        queue.append((channel, report, read_ns))
+        backlog = len(queue)
+        if backlog > self.max_backlog:
+            self.max_backlog = backlog
+        self._wake.set()
+
+    def _start(self) -> None:
+        if self._running:
+            return
+        self._running = True
+        self._reader_thread = threading.Thread(target=self._read_loop, name="MultiplexReader", daemon=True)
+        self._dispatch_thread = threading.Thread(target=self._dispatch_loop, name="MultiplexDispatch", daemon=True)
+        self._dispatch_thread.start()
+        self._reader_thread.start()
+
+    def _close_channel(self, channel: MultiplexChannel) -> None:
+        if channel in self._channels:
+            self._channels.remove(channel)
+        try:
+            channel.device.close()
+        except Exception:
+            pass
+        channel._closed.set()
+        channel.finished.emit()
+
+    # -------------------------------------------------------------------------
+    # Reader thread
+    # -------------------------------------------------------------------------
+
+    def _read_loop(self) -> None:
+        size = self.REPORT_SIZE
+        start = 0
+        perf = time.perf_counter_ns
+        idle = self.idle_sleep
+
+        while self._running:
+            self._changed.clear()
+            while self._added:
+                self._channels.append(self._added.popleft())
+            while self._removed:
+                self._close_channel(self._removed.popleft())
+
+            channels = self._channels
+            count = len(channels)
+            if not count:
+                self._changed.wait()
+                continue
+
+            got_any = False
+            start = (start + 1) % count
+            for i in range(count):
+                channel = channels[(start + i) % count]
+                if not channel._running:
+                    continue
+                try:
+                    report = channel.device.read(size)
+                    if not report:
+                        channel.empty_reads += 1
+                        continue
+
+                    got_any = True
+                    now = perf()
+                    if channel.last_report_ns:
+                        gap = now - channel.last_report_ns
+                        if gap > channel.max_gap_ns:
+                            channel.max_gap_ns = gap
+                    channel.last_report_ns = now
+                    channel.reports += 1
+
+                    if channel.coalesce:
+                        self._handoff_coalesced(channel, report, now)
+                    else:
+                        self.handoff(channel, bytes(report), now)
+                except Exception as e:
+                    # only this device is gone; keep servicing the others
+                    channel.read_errors += 1
+                    channel.error.emit(f"Read failed for {channel.controller}: {e}")
+                    self._close_channel(channel)
+                    break   # channel list changed
+
+            if got_any:
+                idle = self.idle_sleep
+            else:
+                time.sleep(idle)
+                idle = min(idle * 2, self.idle_sleep_max)
+
+        for channel in list(self._channels):
+            self._close_channel(channel)
+
+    def _handoff_coalesced(self, channel: MultiplexChannel, report, read_ns: int) -> None:
+        """
+        Coalesce mode: read up to MAX_DRAIN_PER_TURN more reports from the
+        channel and hand off the newest, plus any intermediate one where the
+        button state (edge_key) changed. Whatever is still pending is read
+        on the channel's next turn, so one backed-up pad cannot hold the
+        thread. Read errors propagate to _read_loop.
+        """
+        edge_key = channel.edge_key
+        latest = bytes(report)
+
+        for _ in range(self.MAX_DRAIN_PER_TURN):
+            nxt = channel.drain(self.REPORT_SIZE)
+            if not nxt:
+                break
+
+            if edge_key is not None:
+                key = edge_key(latest)
+                if key != channel._last_edge:
+                    # button edge inside the burst: don't lose it
+                    channel._last_edge = key
+                    self.handoff(channel, latest, read_ns)
+                else:
+                    channel.coalesced_reports += 1
+            else:
+                channel.coalesced_reports += 1
+
+            latest = bytes(nxt)
+
+        if edge_key is not None:
+            channel._last_edge = edge_key(latest)
+        self.handoff(channel, latest, read_ns)
+
+    # -------------------------------------------------------------------------
+    # Dispatch thread
+    # -------------------------------------------------------------------------
+
+    def _dispatch_loop(self) -> None:
+        queue = self._queue
+        deliver = HIDWorker._deliver
+
+        while self._running:
+            self._wake.wait()
+            self._wake.clear()
+            while queue:
+                channel, report, read_ns = queue.popleft()
+                self._dispatching = channel
+                if channel._running:
+                    deliver(channel, report, read_ns)
+                self._dispatching = None
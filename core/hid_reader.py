@@ -0,0 +1,229 @@
+import hid
+import time
+
+from core import latency
+
+
+# Read modes for HIDReader
+READ_MODE_BLOCKING = "blocking"  # block in read() until a report arrives (default)
+READ_MODE_POLL = "poll"          # short read + fixed sleep (legacy fallback)
+
+
+class HIDReader:
+    """
+    Reads one hidapi device until stop(); run() is the thread body.
+
+    Qt-free: reports go to direct_handler, or to _emit_report() when no
+    handler is set, errors to _emit_error() and the end of run() to
+    _emit_finished(). HIDWorker maps those hooks onto Qt signals; headless
+    code subclasses HIDReader and runs it on a plain thread.
+    """
+
+    # cap on reports drained per wake in coalesce mode
+    MAX_DRAIN = 256
+
+    def __init__(
+        self,
+        controller,
+        poll_interval=0.008,
+        read_mode=READ_MODE_BLOCKING,
+        read_timeout_ms=100,
+        coalesce=False,
+    ):
+        super().__init__()
+        self.controller = controller
+        self.poll_interval = poll_interval
+        self.read_mode = read_mode
+        # upper bound on how long stop() takes to be noticed in blocking mode
+        self.read_timeout_ms = read_timeout_ms
+        self._running = True
+
+        # Coalesce mode: on each wake, drain everything pending and forward
+        # only the newest report. If edge_key is set (report -> hashable
+        # button state, e.g. ProfileDecoder.button_state), intermediate
+        # reports whose button state changed are forwarded too.
+        self.coalesce = coalesce
+        self.edge_key = None
+        self.coalesced_reports = 0
+        self._last_edge = None
+
+        # Direct pipeline mode: when set, reports are handed to this callable
+        # on the reader thread instead of going through _emit_report() (the
+        # queued data_received signal in HIDWorker), so input never waits
+        # on the GUI thread.
+        self.direct_handler = None
+
+        # read -> consumer timestamps (see core.latency)
+        self.trace = latency.trace_for(controller.device_path, getattr(controller, "name", None))
+
+    def stop(self):
+        self._running = False
+
+    # -------------------------------------------------------------------------
+    # Output hooks (HIDWorker turns these into signals)
+    # -------------------------------------------------------------------------
+
+    def _emit_report(self, report: bytes):
+        pass
+
+    def _emit_error(self, message: str):
+        print(f"[HIDReader] {message}")
+
+    def _emit_finished(self):
+        pass
+
+    # -------------------------------------------------------------------------
+    # Reading
+    # -------------------------------------------------------------------------
+
+    def _deliver(self, report: bytes, read_ns: int = 0):
+        """
+        Forward one report, directly or via _emit_report(). read_ns is when
+        it was read (perf_counter_ns), for latency tracing.
+        """
+        if self.trace.enabled:
+            self.trace.sent(read_ns)
+        handler = self.direct_handler
+        if handler is None:
+            self._emit_report(report)
+            return
+        try:
+            handler(report)
+        except Exception as e:
+            self._emit_error(f"Handler failed for {self.controller}: {e}")
+
+    def _timeout_keyword(self, ds):
+        """
+        Return the timeout keyword this hidapi binding's read() accepts
+        ("timeout_ms" or "timeout"), or None if it supports neither.
+
+        The probe read waits at most 1 ms (a timeout of 0 would mean a plain,
+        blocking hid_read()); a report it happens to return is forwarded
+        rather than dropped.
+        """
+        for keyword in ("timeout_ms", "timeout"):
+            try:
+                report = ds.read(65, **{keyword: 1})
+            except TypeError:
+                continue
+            if report:
+                self._deliver(bytes(report))
+            return keyword
+        return None
+
+    @staticmethod
+    def _make_reader(ds, keyword, timeout_ms):
+        """
+        Return a read(size) callable with the given timeout.
+        """
+        if keyword == "timeout_ms":
+            return lambda size: ds.read(size, timeout_ms=timeout_ms)
+        if keyword == "timeout":
+            return lambda size: ds.read(size, timeout=timeout_ms)
+        return lambda size: ds.read(size)
+
+    def run(self):
+        ds = hid.device()
+        try:
+            ds.open_path(self.controller.device_path)
+            # for rid in [0x05, 0x09, 0x20]:
+            #     try:
+            #         data = ds.get_feature_report(rid, 65)
+            #         print(hex(rid), data)
+            #     except Exception as e:
+            #         print("fail", hex(rid), e)
+            ds.get_feature_report(0x05, 65)     # feature report to make the controller give more data
+        except Exception as e:
+            self._emit_error(f"Failed to open {self.controller}: {e}")
+            self._emit_finished()
+            return
+
+        try:
+            keyword = self._timeout_keyword(ds)
+            drain = None
+            if self.coalesce:
+                # read() without a timeout is hid_read(), which honours the
+                # nonblocking flag; reads with a timeout (hid_read_timeout)
+                # ignore it, so the main read below still waits
+                ds.set_nonblocking(1)
+                drain = ds.read
+
+            if self.read_mode == READ_MODE_BLOCKING and keyword is not None:
+                timeout_ms = max(1, self.read_timeout_ms)   # 0 would mean hid_read()
+                self._run_blocking(self._make_reader(ds, keyword, timeout_ms), drain)
+            else:
+                if self.read_mode == READ_MODE_BLOCKING:
+                    print(f"[HIDReader] Blocking reads unsupported for {self.controller}, falling back to polling")
+                self._run_poll(self._make_reader(ds, keyword, 1), drain)
+
+        except Exception as e:
+            self._emit_error(str(e))
+
+        finally:
+            ds.close()
+            self._emit_finished()
+
+    def _run_blocking(self, read, drain=None):
+        """
+        Wait in read() and forward each report as soon as it arrives.
+        Returns within read_timeout_ms of stop() being called.
+        """
+        perf = time.perf_counter_ns
+        while self._running:
+            report = read(65)
+            if report and self._running:
+                read_ns = perf()
+                if drain is None:
+                    self._deliver(bytes(report), read_ns)
+                else:
+                    self._forward_coalesced(report, drain, read_ns)
+
+    def _run_poll(self, read, drain=None):
+        """
+        Legacy mode: 1 ms read followed by a fixed sleep of poll_interval.
+        """
+        while self._running:
+            report = read(65)
+            # for i, r in enumerate(report):
+            #     if not r:
+            #         report = report[:i] + report[i+1:]
+            # print(report)
+
+            if report:
+                read_ns = time.perf_counter_ns()
+                if drain is None:
+                    self._deliver(bytes(report), read_ns)
+                else:
+                    self._forward_coalesced(report, drain, read_ns)
+
+            time.sleep(self.poll_interval)
+
+    def _forward_coalesced(self, report, drain, read_ns=0):
+        """
+        Drain pending reports and forward the newest one, plus any
+        intermediate report where the button state (edge_key) changed.
+        """
+        edge_key = self.edge_key
+        latest = bytes(report)
+
+        for _ in range(self.MAX_DRAIN):
+            nxt = drain(65)
+            if not nxt:
+                break
+
+            if edge_key is not None:
+                key = edge_key(latest)
+                if key != self._last_edge:
+                    # button edge inside the burst: don't lose it
+                    self._last_edge = key
+                    self._deliver(latest, read_ns)
+                else:
+                    self.coalesced_reports += 1
+            else:
+                self.coalesced_reports += 1
+
+            latest = bytes(nxt)
+
+        if edge_key is not None:
+            self._last_edge = edge_key(latest)
+        self._deliver(latest, read_ns)
@@ -0,0 +1,227 @@
+import os
+import select
+import threading
+import time
+
+from .hid_manager import HIDWorker
+
+
+# ioctl(HIDIOCGFEATURE(len)) = _IOC(_IOC_READ | _IOC_WRITE, 'H', 0x07, len)
+def _hidiocgfeature(length: int) -> int:
+    return (3 << 30) | (length << 16) | (ord("H") << 8) | 0x07
+
+
+def hidraw_node(device_path) -> str:
+    """
+    Return the /dev/hidraw* node for a hidapi device path.
+
+    hidapi's Linux hidraw backend already uses the node as the path; other
+    backends (libusb, Windows, macOS) do not, and raise ValueError.
+    """
+    path = device_path.decode() if isinstance(device_path, bytes) else str(device_path)
+    if not path.startswith("/dev/hidraw"):
+        raise ValueError(f"Not a hidraw device node: {path}")
+    return path
+
+
+class HidrawChannel(HIDWorker):
+    """
+    One /dev/hidraw* device serviced by an EpollHidrawReader.
+
+    Exposes the same signals and attributes as HIDWorker (data_received,
+    error, finished, edge_key, direct_handler, coalesce), so HIDManager can
+    attach and detach consumers without knowing which backend is in use.
+    """
+
+    def __init__(self, controller, reader, coalesce=False):
+        super().__init__(controller, coalesce=coalesce)
+        self.reader = reader
+        self.fd = None
+        self.reports = 0
+
+    def run(self):
+        raise RuntimeError("HidrawChannel is driven by EpollHidrawReader")
+
+    def stop(self):
+        self._running = False
+        self.reader.remove(self)
+
+    def drain(self, size):
+        """
+        Non-blocking read for _forward_coalesced(); None when nothing is
+        pending. A failed read is reported and removes the channel, as in
+        EpollHidrawReader._service().
+        """
+        if self.fd is None:
+            return None
+        try:
+            return os.read(self.fd, size)
+        except BlockingIOError:
+            return None
+        except OSError as e:
+            self.error.emit(f"Read failed for {self.controller}: {e}")
+            self.reader.remove(self)
+            return None
+
+
+class EpollHidrawReader:
+    """
+    Reads every open /dev/hidraw* device from a single thread.
+
+    The thread sleeps in epoll until a device has a report, reads one
+    report from each ready device per wake (level-triggered, so a busy pad
+    cannot starve the others) and hands it to the device's channel.
+    A pipe wakes the thread for shutdown; there is no polling timeout.
+    """
+
+    REPORT_SIZE = 65
+
+    def __init__(self):
+        self._epoll = select.epoll()
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        self._epoll.register(self._wake_r, select.EPOLLIN)
+
+        self._channels = {}  # fd -> HidrawChannel
+        # held while dispatching, so remove() returns only once the reader
+        # is no longer delivering to the removed channel
+        self._lock = threading.RLock()
+        self._thread = None
+        self._running = False
+        # close() was called on the reader thread: _run() closes the fds
+        self._close_on_exit = False
+
+    # -------------------------------------------------------------------------
+    # Device registration
+    # -------------------------------------------------------------------------
+
+    def add(self, channel: HidrawChannel) -> bool:
+        """
+        Open the channel's device and start servicing it. Failures are
+        reported through channel.error and return False.
+        """
+        try:
+            fd = os.open(hidraw_node(channel.controller.device_path), os.O_RDWR | os.O_NONBLOCK)
+        except (OSError, ValueError) as e:
+            channel.error.emit(f"Failed to open {channel.controller}: {e}")
+            channel.finished.emit()
+            return False
+
+        self._request_feature(fd, 0x05)     # feature report to make the controller give more data
+
+        with self._lock:
+            channel.fd = fd
+            self._channels[fd] = channel
+            self._epoll.register(fd, select.EPOLLIN)
+            if self._thread is None:
+                self._running = True
+                self._thread = threading.Thread(target=self._run, name="EpollHidrawReader", daemon=True)
+                self._thread.start()
+        return True
+
+    def remove(self, channel: HidrawChannel) -> None:
+        """
+        Stop servicing a channel and close its device. Safe to call twice.
+        """
+        with self._lock:
+            fd = channel.fd
+            if fd is None or self._channels.get(fd) is not channel:
+                return
+            del self._channels[fd]
+            channel.fd = None
+            try:
+                self._epoll.unregister(fd)
+            except OSError:
+                pass
+            os.close(fd)
+        channel.finished.emit()
+
+    def close(self) -> None:
+        """
+        Remove every channel, stop the reader thread and close the epoll
+        and wake pipe fds. The reader cannot be reused afterwards.
+        """
+        for channel in list(self._channels.values()):
+            self.remove(channel)
+
+        self._running = False
+        if self._wake_w is None:
+            return  # already closed
+        os.write(self._wake_w, b"\0")
+
+        thread, self._thread = self._thread, None
+        if thread is threading.current_thread():
+            self._close_on_exit = True
+            return
+        if thread is not None:
+            thread.join()
+        self._close_fds()
+
+    def _close_fds(self) -> None:
+        self._epoll.close()
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+        self._wake_r = self._wake_w = None
+
+    @staticmethod
+    def _request_feature(fd: int, report_id: int) -> None:
+        try:
+            import fcntl
+
+            buf = bytearray(65)
+            buf[0] = report_id
+            fcntl.ioctl(fd, _hidiocgfeature(len(buf)), buf)
+        except OSError:
+            pass
+
+    # -------------------------------------------------------------------------
+    # Reader thread
+    # -------------------------------------------------------------------------
+
+    def _run(self) -> None:
+        while self._running:
+            try:
+                events = self._epoll.poll()
+            except InterruptedError:
+                continue
+
+            with self._lock:
+                for fd, mask in events:
+                    if fd == self._wake_r:
+                        try:
+                            os.read(self._wake_r, 64)
+                        except BlockingIOError:
+                            pass
+                        continue
+
+                    channel = self._channels.get(fd)
+                    if channel is None:
+                        continue
+                    self._service(channel, mask)
+
+        if self._close_on_exit:
+            self._close_fds()
+
+    def _service(self, channel: HidrawChannel, mask: int) -> None:
+        report = None
+        if mask & select.EPOLLIN:
+            try:
+                report = os.read(channel.fd, self.REPORT_SIZE)
+            except BlockingIOError:
+                return
+            except OSError as e:
+                channel.error.emit(f"Read failed for {channel.controller}: {e}")
+                self.remove(channel)
+                return
+
+        if report:
+            read_ns = time.perf_counter_ns()
+            channel.reports += 1
+            if channel.coalesce:
+                channel._forward_coalesced(report, channel.drain, read_ns)
+            else:
+                channel._deliver(report, read_ns)
+        elif mask & (select.EPOLLHUP | select.EPOLLERR) or report == b"":
+            # unplugged
+            channel.error.emit(f"Device disconnected: {channel.controller}")
+            self.remove(channel)
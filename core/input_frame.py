@@ -0,0 +1,99 @@
+"""
+Binary input frames for authenticated phone clients.
+
+A client lists the frame versions it can send in its JSON messages
+("frames": [1]). Once it is authenticated the server answers with one JSON
+line, {"type": "auth_ok", "frame_version": <v>}, choosing the newest version
+both sides support (0 = keep sending JSON). From then on the client sends
+fixed-size frames instead of JSON lines; JSON lines already in flight are
+still accepted.
+
+Frame v1, 15 bytes, little-endian:
+    u8   magic    0xB1 (never the first byte of a UTF-8 JSON line)
+    u16  seq      incremented per frame, wraps
+    u32  time_ms  sender clock in milliseconds, wraps
+    u16  buttons  bit i set = FRAME_BUTTONS[i] pressed
+    u8   left_x, left_y, right_x, right_y   (0..255, 128 = centre)
+    u8   l2, r2                              (0..255)
+
+The phone client (phone_client_with_auth.py) carries its own copy of the
+packing code, since it ships without this package; keep them in sync.
+"""
+
+import struct
+from typing import Dict, Tuple
+
+
+FRAME_V1 = 1
+FRAME_V1_MAGIC = 0xB1
+SUPPORTED_FRAME_VERSIONS = (FRAME_V1,)
+
+_V1 = struct.Struct("<BHIH6B")
+FRAME_V1_SIZE = _V1.size
+
+# magic byte -> frame size, for LineFramer
+FIXED_FRAMES: Dict[int, int] = {FRAME_V1_MAGIC: FRAME_V1_SIZE}
+
+# bit order of the buttons field (names as in the JSON "buttons" object)
+FRAME_BUTTONS = (
+    "A", "B", "X", "Y",
+    "LB", "RB", "BACK", "START", "GUIDE",
+    "L3", "R3",
+    "DPAD_UP", "DPAD_DOWN", "DPAD_LEFT", "DPAD_RIGHT",
+)
+
+InputFrame = Tuple[int, int, int, int, int, int, int, int, int]
+
+
+def negotiate(offered) -> int:
+    """
+    Return the newest frame version in both `offered` and
+    SUPPORTED_FRAME_VERSIONS, or 0 if there is none.
+    """
+    try:
+        common = set(int(v) for v in offered) & set(SUPPORTED_FRAME_VERSIONS)
+    except (TypeError, ValueError):
+        return 0
+    return max(common) if common else 0
+
+
+def pack_v1(seq: int, time_ms: int, buttons: int, lx: int, ly: int, rx: int, ry: int, l2: int, r2: int) -> bytes:
+    return _V1.pack(FRAME_V1_MAGIC, seq & 0xFFFF, time_ms & 0xFFFFFFFF, buttons & 0xFFFF, lx, ly, rx, ry, l2, r2)
+
+
+def unpack_v1(frame: bytes) -> InputFrame:
+    """
+    :return: (seq, time_ms, buttons, lx, ly, rx, ry, l2, r2)
+    :raises ValueError: If `frame` is not a v1 frame.
+    """
+    if len(frame) != FRAME_V1_SIZE or frame[0] != FRAME_V1_MAGIC:
+        raise ValueError("Not a v1 input frame")
+    return _V1.unpack(frame)[1:]
+
+
+def buttons_to_mask(buttons: dict) -> int:
+    mask = 0
+    for i, name in enumerate(FRAME_BUTTONS):
+        if buttons.get(name):
+            mask |= 1 << i
+    return mask
+
+
+def frame_to_state(frame: InputFrame) -> dict:
+    """
+    Convert an unpacked frame to the {"buttons", "analog", "joystick"}
+    dict Phone_mapper.handle_hid_data() takes.
+    """
+    _, _, mask, lx, ly, rx, ry, l2, r2 = frame
+    return {
+        "buttons": {name: bool(mask >> i & 1) for i, name in enumerate(FRAME_BUTTONS)},
+        "analog": {"L2": l2, "R2": r2},
+        "joystick": {"left_x": lx, "left_y": ly, "right_x": rx, "right_y": ry},
+    }
+
+
+def seq_newer(seq: int, last: int) -> bool:
+    """
+    True if 16-bit sequence number `seq` comes after `last` (RFC 1982).
+    """
+    return 0 < ((seq - last) & 0xFFFF) < 0x8000
@@ -0,0 +1,255 @@
+"""
+Per-device input latency tracing.
+
+Every report is stamped with time.perf_counter_ns() where it enters the
+process (HID read, or socket receive for network clients), and each stage
+it passes through adds its duration to a fixed-bucket histogram of that
+device's DeviceTrace:
+
+    read     HID read -> handed to the consumer (coalesce drain, multiplex
+             handoff); socket receive -> message parsed
+    signal   handed over -> Mapper entry (queued Qt signal, server mailbox)
+    decode   Mapper entry -> EmulateX360.update() called
+    hotkey   hotkey lookup and dispatch in EmulateX360.update()
+    pad      virtual pad backend update()
+    total    read/receive -> Mapper done
+
+Recording is a bisect and a few integer additions, cheap enough to leave
+on. Call dump() (or send SIGUSR1 after install_dump_signal(), on POSIX)
+to print percentiles; set_enabled(False) turns stamping off everywhere.
+
+Percentiles are bucket upper bounds, so they are exact to one bucket.
+"""
+
+import signal
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, List, Optional
+
+
+STAGE_READ = "read"
+STAGE_SIGNAL = "signal"
+STAGE_DECODE = "decode"
+STAGE_HOTKEY = "hotkey"
+STAGE_PAD = "pad"
+STAGE_TOTAL = "total"
+STAGES = (STAGE_READ, STAGE_SIGNAL, STAGE_DECODE, STAGE_HOTKEY, STAGE_PAD, STAGE_TOTAL)
+
+# bucket upper bounds in microseconds; the last bucket is open-ended
+BUCKET_BOUNDS_US = (
+    5, 10, 20, 50, 100, 200, 500,
+    1000, 2000, 4000, 8000, 16000, 32000, 64000, 128000, 256000, 1000000,
+)
+_BOUNDS_NS = tuple(us * 1000 for us in BUCKET_BOUNDS_US)
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+# reports handed over but not yet picked up by the consumer
+MAX_INFLIGHT = 256
+
+_perf = time.perf_counter_ns
+
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram. Not locked: each stage of a device is
+    written from one thread, and a racing dump() only sees a slightly
+    stale copy.
+    """
+
+    __slots__ = ("counts", "count", "total_ns", "max_ns")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.counts = [0] * (len(_BOUNDS_NS) + 1)
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, ns: int) -> None:
+        self.counts[bisect_left(_BOUNDS_NS, ns)] += 1
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        Upper bound, in microseconds, of the bucket holding the p-th
+        percentile; the maximum seen for the open-ended bucket. None if
+        nothing was recorded.
+        """
+        if not self.count:
+            return None
+        rank = self.count * p / 100.0
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                if i < len(BUCKET_BOUNDS_US):
+                    return min(float(BUCKET_BOUNDS_US[i]), self.max_ns / 1000.0)
+                break
+        return self.max_ns / 1000.0
+
+    def mean_us(self) -> Optional[float]:
+        return self.total_ns / self.count / 1000.0 if self.count else None
+
+
+class DeviceTrace:
+    """
+    Histograms for one device (HID path or network client uuid), plus the
+    timestamps of reports handed to the consumer and not yet picked up.
+
+    The producer calls sent(read_ns) for every report it delivers, the
+    consumer calls received() once per report it takes, in the same order.
+    """
+
+    def __init__(self, key, name: str):
+        self.key = key
+        self.name = name
+        self.enabled = _enabled
+        self.histograms: Dict[str, Histogram] = {stage: Histogram() for stage in STAGES}
+        self._inflight = deque(maxlen=MAX_INFLIGHT)
+        self.entry_ns = 0
+
+    def record(self, stage: str, ns: int) -> None:
+        self.histograms[stage].record(ns)
+
+    def sent(self, read_ns: int = 0, sent_ns: int = 0) -> None:
+        """
+        Producer side: a report read at read_ns (0 = now) is being, or was
+        at sent_ns, handed to the consumer.
+        """
+        now = sent_ns or _perf()
+        if not read_ns:
+            read_ns = now
+        self.histograms[STAGE_READ].record(now - read_ns)
+        self._inflight.append((read_ns, now))
+
+    def received(self) -> int:
+        """
+        Consumer side: take the oldest in-flight report. Returns its read
+        timestamp, or 0 if none is known.
+        """
+        now = _perf()
+        self.entry_ns = now
+        try:
+            read_ns, sent_ns = self._inflight.popleft()
+        except IndexError:
+            return 0
+        self.histograms[STAGE_SIGNAL].record(now - sent_ns)
+        return read_ns
+
+    def resync(self) -> None:
+        """
+        Forget in-flight reports, e.g. when a consumer is attached to a
+        device whose reports nobody was taking.
+        """
+        self._inflight.clear()
+
+    def reset(self) -> None:
+        for hist in self.histograms.values():
+            hist.reset()
+
+    def summary(self) -> Dict[str, dict]:
+        out = {}
+        for stage, hist in self.histograms.items():
+            if not hist.count:
+                continue
+            row = {"count": hist.count, "mean_us": hist.mean_us(), "max_us": hist.max_ns / 1000.0}
+            for p in PERCENTILES:
+                row[f"p{p:g}_us"] = hist.percentile(p)
+            out[stage] = row
+        return out
+
+
+_enabled = True
+_traces: Dict[object, DeviceTrace] = {}
+_lock = threading.Lock()
+
+
+def trace_for(key, name: Optional[str] = None) -> DeviceTrace:
+    """
+    Return the DeviceTrace for a device path or client uuid, creating it
+    on first use. Producers and consumers of one device share it.
+    """
+    trace = _traces.get(key)
+    if trace is None:
+        with _lock:
+            trace = _traces.get(key)
+            if trace is None:
+                if name is None:
+                    name = key.decode(errors="replace") if isinstance(key, bytes) else str(key)
+                trace = _traces[key] = DeviceTrace(key, name)
+    return trace
+
+
+def set_enabled(enabled: bool) -> None:
+    global _enabled
+    _enabled = bool(enabled)
+    for trace in list(_traces.values()):
+        trace.enabled = _enabled
+        trace.resync()
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    for trace in list(_traces.values()):
+        trace.reset()
+
+
+def summary() -> Dict[str, Dict[str, dict]]:
+    """
+    {device name: {stage: {"count", "mean_us", "max_us", "p50_us", ...}}}
+    """
+    return {trace.name: trace.summary() for trace in list(_traces.values())}
+
+
+def report() -> str:
+    """
+    Percentile table for every traced device, in microseconds.
+    """
+    columns = ["count", "mean"] + [f"p{p:g}" for p in PERCENTILES] + ["max"]
+    lines: List[str] = []
+    for name, stages in summary().items():
+        if not stages:
+            continue
+        lines.append(f"{name}")
+        lines.append(f"  {'stage':<8}" + "".join(f"{c:>10}" for c in columns))
+        for stage in STAGES:
+            row = stages.get(stage)
+            if row is None:
+                continue
+            values = [row["mean_us"]] + [row[f"p{p:g}_us"] for p in PERCENTILES] + [row["max_us"]]
+            lines.append(
+                f"  {stage:<8}{row['count']:>10}" + "".join(f"{v:>10.1f}" for v in values)
+            )
+    if not lines:
+        return "No latency samples recorded."
+    return "Input latency (us, percentiles are bucket upper bounds)\n" + "\n".join(lines)
+
+
+def dump() -> None:
+    print(report(), flush=True)
+
+
+def install_dump_signal() -> bool:
+    """
+    Print report() whenever the process receives SIGUSR1. Returns False
+    where there is no SIGUSR1 (Windows) or when not on the main thread.
+    """
+    sig = getattr(signal, "SIGUSR1", None)
+    if sig is None:
+        return False
+    try:
+        signal.signal(sig, lambda signum, frame: dump())
+    except ValueError:
+        return False
+    return True
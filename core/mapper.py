@@ -1,8 +1,11 @@
 import json
-from typing import Tuple
+import time
 
+from core import latency
 from core.emulator import EmulateX360, EmulateKeyboard
 from core.mouse import Mouse
+from core.profile_decoder import ProfileDecoder
+from core.stick_curve import StickTables
 
 
 class Mapper:
@@ -19,6 +22,7 @@ class Mapper:
         controllers_page,
         hotkey_page,
         debug: bool = False,
+        backend=None,
     ):
         self.controller = controller
         self.controller_type = controller_type
@@ -35,11 +39,18 @@ class Mapper:
         self._prev_b = False
         self._prev_battery = []
 
+        # change detection: skip reports whose relevant bits did not change
+        self._last_state = None
+        self._last_generation = -1
+        self.reports_processed = 0
+        self.reports_skipped = 0
+
         if emulate_to == "x360":
             self.emulator = EmulateX360(
                 controller.device_path,
                 controller.name,
                 hotkey_page.hotkey,
+                backend=backend,
             )
             controllers_page.add_x360_instance(self.emulator)
             hotkey_page.add_x360_instance(self.emulator)
@@ -49,6 +60,11 @@ class Mapper:
             raise ValueError(f"Invalid emulate_to target: {emulate_to}")
 
         self.controller_config = self._load_json(f"{controller_type}.json")
+        self.decoder = ProfileDecoder(self.controller_config)
+        self._sticks = StickTables()
+
+        self.trace = latency.trace_for(controller.device_path, controller.name)
+        self.emulator.trace = self.trace
 
     # -------------------------------------------------------------------------
     # Lifecycle
@@ -98,6 +114,8 @@ class Mapper:
         """
         Dispatch raw HID report to the appropriate handler.
         """
+        trace = self.trace
+        read_ns = trace.received() if trace.enabled else 0
         if not self._connected:
             return
 
@@ -106,6 +124,9 @@ class Mapper:
         else:
             self._handle_keyboard_input(data)
 
+        if read_ns:
+            trace.record(latency.STAGE_TOTAL, time.perf_counter_ns() - read_ns)
+
     def handle_error(self, msg: str) -> None:
         """
         Handle device-level errors.
@@ -117,95 +138,6 @@ class Mapper:
     # Helpers
     # -------------------------------------------------------------------------
 
-    @staticmethod
-    def _clamp(v: int, lo: int, hi: int) -> int:
-        return max(lo, min(hi, v))
-
-    @staticmethod
-    def _scale_stick_0_255_to_x360(val: int, invert_y: bool) -> int:
-        """
-        Convert 0–255 axis value to XInput signed 16‑bit range.
-        """
-        centered = float(val) - 128.0
-        normalized = -centered / 127.0 if invert_y else centered / 127.0
-        scaled = int(round(normalized * 32767.0))
-        return int(Mapper._clamp(scaled, -32768, 32767))
-
-    def _read_byte_safe(self, report: list[int], idx: int | None) -> int:
-        """
-        Safely read a byte from a HID report by index.
-        """
-        if idx is None or idx < 0 or idx >= len(report):
-            return 0
-        return report[idx]
-
-    def _get_button_from_cfg(self, report: list[int], cfg: dict | None) -> bool:
-        """
-        Decode a digital button state from the report using a mapping entry.
-        """
-        if cfg is None:
-            return False
-
-        byte_idx = cfg.get("index", cfg.get("byte"))
-        val = self._read_byte_safe(report, byte_idx)
-
-        mask = cfg.get("mask")
-        if mask is not None:
-            mask_int = int(mask, 16) if isinstance(mask, str) else int(mask)
-            val &= mask_int
-
-        if "value" in cfg:
-            return val == cfg["value"]
-        return val != 0
-
-    def _get_dpad_from_hat(self, report: list[int], cfg: dict | None) -> Tuple[bool, bool, bool, bool]:
-        """
-        Decode a hat‑switch style D‑Pad into individual directions.
-        """
-        if cfg is None:
-            return False, False, False, False
-
-        byte_idx = cfg.get("byte")
-        raw_val = self._read_byte_safe(report, byte_idx)
-
-        mask = cfg.get("mask", 0x0F)
-        if isinstance(mask, str):
-            mask = int(mask, 16)
-
-        hat_val = raw_val & mask
-
-        up = hat_val in (0, 1, 7)
-        down = hat_val in (3, 4, 5)
-        right = hat_val in (1, 2, 3)
-        left = hat_val in (5, 6, 7)
-
-        return up, down, left, right
-
-    def _apply_deadzone(
-        self,
-        raw_x: int,
-        raw_y: int,
-        deadzone: float,
-        invertion: Tuple[bool, bool],
-    ) -> Tuple[int, int]:
-        """
-        Apply radial deadzone and axis inversion, then scale to XInput space.
-        """
-        invert_x, invert_y = invertion
-
-        cx = raw_x - 128
-        cy = raw_y - 128
-
-        if abs(cx) < deadzone * 127:
-            cx = 0
-        if abs(cy) < deadzone * 127:
-            cy = 0
-
-        x_scaled = self._scale_stick_0_255_to_x360(cx + 128, invert_x)
-        y_scaled = self._scale_stick_0_255_to_x360(cy + 128, invert_y)
-
-        return x_scaled, y_scaled
-
     def _apply_button_invertion(self, button: bool, invert: bool) -> bool:
         """
         Optionally invert a digital button state.
@@ -238,49 +170,48 @@ class Mapper:
         """
         Decode a HID report and forward it to the X360 emulator.
         """
-        report = list(data)
-        if len(report) < 10:
+        if len(data) < 10:
             return
 
-        axes_cfg = self.controller_config.get("axes", {})
-        buttons_cfg = self.controller_config.get("buttons", {})
-        dpad_cfg = self.controller_config.get("dpad_hat", {})
-        battery_cfg = self.controller_config.get("battery_status", {})
-
-        raw_ljx = self._read_byte_safe(report, axes_cfg.get("left_stick_x", {}).get("byte"))
-        raw_ljy = self._read_byte_safe(report, axes_cfg.get("left_stick_y", {}).get("byte"))
-        raw_rjx = self._read_byte_safe(report, axes_cfg.get("right_stick_x", {}).get("byte"))
-        raw_rjy = self._read_byte_safe(report, axes_cfg.get("right_stick_y", {}).get("byte"))
-        raw_lt = self._read_byte_safe(report, axes_cfg.get("left_trigger", {}).get("byte"))
-        raw_rt = self._read_byte_safe(report, axes_cfg.get("right_trigger", {}).get("byte"))
-        raw_battery = self._read_byte_safe(report, battery_cfg.get("percent", {}).get("byte"))
+        cfg = self.settings.snapshot()
+
+        # Identical input under identical settings maps to the identical
+        # emulator state. Mouse mode, held hotkeys and the monitor dialogs
+        # still need every tick (cursor motion / auto-repeat / live view),
+        # so they are never skipped.
+        state = self.decoder.relevant_state(data)
+        if (
+            state == self._last_state
+            and cfg.generation == self._last_generation
+            and not (cfg.mouse_mode or self.mouse_mode_hotkey)
+            and not self.emulator.hotkey_held
+            and not self.emulator.is_monitoring
+        ):
+            self.reports_skipped += 1
+            return
+        self._last_state = state
+        self._last_generation = cfg.generation
+        self.reports_processed += 1
+
+        (
+            raw_ljx, raw_ljy, raw_rjx, raw_rjy, raw_lt, raw_rt, raw_battery,
+            a, b, x_, y_, lb, rb, back, start, l3, r3,
+            dpu, dpd, dpl, dpr,
+        ) = self.decoder.decode(data)
         battery_percent, is_charging = self._interpret_battery(raw_battery)
         # print(f"Battery: {battery_percent}%, Charging: {is_charging}")
 
+        sticks = self._sticks.refresh(cfg)
+        button_inv = cfg.invert_buttons
 
-        left_deadzone, right_deadzone = self.settings.get_deadzones()
-        left_inv, right_inv = self.settings.get_joystick_invertion()
-        button_inv = self.settings.get_button_invertion()
-
-        ljx, ljy = self._apply_deadzone(raw_ljx, raw_ljy, left_deadzone, left_inv)
-        rjx, rjy = self._apply_deadzone(raw_rjx, raw_rjy, right_deadzone, right_inv)
+        ljx = sticks.left_x[raw_ljx]
+        ljy = sticks.left_y[raw_ljy]
+        rjx = sticks.right_x[raw_rjx]
+        rjy = sticks.right_y[raw_rjy]
 
         lt = int(raw_lt)
         rt = int(raw_rt)
 
-        a = self._get_button_from_cfg(report, buttons_cfg.get("cross"))
-        b = self._get_button_from_cfg(report, buttons_cfg.get("circle"))
-        x_ = self._get_button_from_cfg(report, buttons_cfg.get("square"))
-        y_ = self._get_button_from_cfg(report, buttons_cfg.get("triangle"))
-        lb = self._get_button_from_cfg(report, buttons_cfg.get("l1"))
-        rb = self._get_button_from_cfg(report, buttons_cfg.get("r1"))
-        back = self._get_button_from_cfg(report, buttons_cfg.get("share"))
-        start = self._get_button_from_cfg(report, buttons_cfg.get("option"))
-        l3 = self._get_button_from_cfg(report, buttons_cfg.get("l3"))
-        r3 = self._get_button_from_cfg(report, buttons_cfg.get("r3"))
-
-        dpu, dpd, dpl, dpr = self._get_dpad_from_hat(report, dpad_cfg)
-
         a = self._apply_button_invertion(a, button_inv)
         b = self._apply_button_invertion(b, button_inv)
         x_ = self._apply_button_invertion(x_, button_inv)
@@ -295,14 +226,18 @@ class Mapper:
         if back and r3 and not (self._prev_back and self._prev_r3):
             self.mouse_mode_hotkey = not self.mouse_mode_hotkey
 
-        self.mouse_mode = self.settings.get_mouse_mode()
+        self.mouse_mode = cfg.mouse_mode
+
+        trace = self.trace
+        if trace.enabled:
+            trace.record(latency.STAGE_DECODE, time.perf_counter_ns() - trace.entry_ns)
 
         if self.mouse_mode or self.mouse_mode_hotkey:
             if not hasattr(self, "_mx"):
                 self._mx = 0.0
                 self._my = 0.0
 
-            sensitivity = self.settings.get_mouse_sensitivity()
+            sensitivity = cfg.mouse_sensitivity
             nx = ljx / 32768.0
             ny = ljy / 32768.0
 
@@ -357,21 +292,41 @@ class Phone_mapper:
         hotkey_page,
         settings,
         debug: bool = False,
+        backend=None,
     ):
         self.uuid = uuid
         self.settings = settings
         self.debug = debug
         self._connected = True
         self.controllers_page = controllers_page
+        self._sticks = StickTables()
 
         if emulate_to == "x360":
-            self.emulator = EmulateX360(self.uuid, self.uuid, hotkey_page.hotkey)
+            self.emulator = EmulateX360(self.uuid, self.uuid, hotkey_page.hotkey, backend=backend)
             self.controllers_page.add_x360_instance(self.emulator)
         elif emulate_to == "keyboard":
             self.emulator = EmulateKeyboard()
         else:
             raise ValueError(f"Invalid emulate_to target: {emulate_to}")
 
+        # shared with the server session, which stamps socket receive
+        self.trace = latency.trace_for(uuid)
+        self.emulator.trace = self.trace
+
+    def stop(self) -> None:
+        """
+        Stop processing input and shut down the emulator if supported.
+        """
+        if self._connected:
+            print(f"[Phone_mapper] Stopped mapping for {self.uuid}")
+        self._connected = False
+
+        if hasattr(self.emulator, "shutdown"):
+            try:
+                self.emulator.shutdown()
+            except Exception as e:
+                print(f"[Phone_mapper] Failed to shutdown emulator: {e}")
+
     # -------------------------------------------------------------------------
     # HID entry points
     # -------------------------------------------------------------------------
@@ -380,6 +335,8 @@ class Phone_mapper:
         """
         Dispatch JSON gamepad state from phone to the appropriate handler.
         """
+        trace = self.trace
+        read_ns = trace.received() if trace.enabled else 0
         if not self._connected:
             return
 
@@ -388,6 +345,9 @@ class Phone_mapper:
         else:
             self._handle_keyboard_input(data)
 
+        if read_ns:
+            trace.record(latency.STAGE_TOTAL, time.perf_counter_ns() - read_ns)
+
     def _handle_keyboard_input(self, data: dict) -> None:
         """
         Placeholder for keyboard emulation mapping from phone input.
@@ -399,40 +359,14 @@ class Phone_mapper:
     # -------------------------------------------------------------------------
 
     @staticmethod
-    def _clamp(v: int, lo: int, hi: int) -> int:
-        return max(lo, min(hi, v))
-
-    @staticmethod
-    def _scale_stick_0_255_to_x360(val: int, invert_y: bool) -> int:
-        centered = float(val) - 128.0
-        normalized = -centered / 127.0 if invert_y else centered / 127.0
-        scaled = int(round(normalized * 32767.0))
-        return int(Phone_mapper._clamp(scaled, -32768, 32767))
-
-    def _apply_deadzone(
-        self,
-        raw_x: int,
-        raw_y: int,
-        deadzone: float,
-        invertion: Tuple[bool, bool],
-    ) -> Tuple[int, int]:
+    def _stick_byte(val) -> int:
         """
-        Apply deadzone and inversion for phone joystick input (0–255).
+        Coerce a phone joystick value into a 0–255 table index.
         """
-        invert_x, invert_y = invertion
-
-        cx = raw_x - 128
-        cy = raw_y - 128
-
-        if abs(cx) < deadzone * 127:
-            cx = 0
-        if abs(cy) < deadzone * 127:
-            cy = 0
-
-        x_scaled = self._scale_stick_0_255_to_x360(cx + 128, invert_x)
-        y_scaled = self._scale_stick_0_255_to_x360(cy + 128, invert_y)
-
-        return x_scaled, y_scaled
+        try:
+            return max(0, min(255, int(val)))
+        except (TypeError, ValueError):
+            return 128
 
     def _apply_button_invertion(self, button: bool, invert: bool) -> bool:
         """
@@ -452,17 +386,14 @@ class Phone_mapper:
         analog = data.get("analog", {})
         joystick = data.get("joystick", {})
 
-        left_deadzone, right_deadzone = self.settings.get_deadzones()
-        left_inv, right_inv = self.settings.get_joystick_invertion()
-        button_inv = self.settings.get_button_invertion()
-
-        lx_val = joystick.get("left_x", 128)
-        ly_val = joystick.get("left_y", 128)
-        rx_val = joystick.get("right_x", 128)
-        ry_val = joystick.get("right_y", 128)
+        cfg = self.settings.snapshot()
+        sticks = self._sticks.refresh(cfg)
+        button_inv = cfg.invert_buttons
 
-        ljx, ljy = self._apply_deadzone(lx_val, ly_val, left_deadzone, left_inv)
-        rjx, rjy = self._apply_deadzone(rx_val, ry_val, right_deadzone, right_inv)
+        ljx = sticks.left_x[self._stick_byte(joystick.get("left_x", 128))]
+        ljy = sticks.left_y[self._stick_byte(joystick.get("left_y", 128))]
+        rjx = sticks.right_x[self._stick_byte(joystick.get("right_x", 128))]
+        rjy = sticks.right_y[self._stick_byte(joystick.get("right_y", 128))]
 
         a = buttons.get("A", False)
         b = buttons.get("B", False)
@@ -493,6 +424,10 @@ class Phone_mapper:
         l3 = self._apply_button_invertion(l3, button_inv)
         r3 = self._apply_button_invertion(r3, button_inv)
 
+        trace = self.trace
+        if trace.enabled:
+            trace.record(latency.STAGE_DECODE, time.perf_counter_ns() - trace.entry_ns)
+
         self.emulator.update(
             ljx, ljy, rjx, rjy,
             a, x_, b, y_,
@@ -1,19 +1,31 @@
-import pyautogui
+_pyautogui = None
+
+
+def _gui():
+    """
+    Import pyautogui on first use; it is slow to import and needs a
+    display, so only mouse mode should pay for it.
+    """
+    global _pyautogui
+    if _pyautogui is None:
+        import pyautogui
+        _pyautogui = pyautogui
+    return _pyautogui
 
 
 class Mouse:
     @staticmethod
     def move(x: int, y: int, duration: float = 0.0):
-        pyautogui.moveTo(x, y, duration=duration)
+        _gui().moveTo(x, y, duration=duration)
         
     @staticmethod
     def moveRel(dx, dy, duration=0.0):
-        pyautogui.moveRel(int(dx), int(dy), duration=duration)
+        _gui().moveRel(int(dx), int(dy), duration=duration)
 
     @staticmethod
     def leftClick():
-        pyautogui.click(button="left")
+        _gui().click(button="left")
 
     @staticmethod
     def rightClick():
-        pyautogui.click(button="right")
+        _gui().click(button="right")
@@ -0,0 +1,193 @@
+from typing import Tuple
+
+
+# Profile button names in the order ProfileDecoder.decode() returns them
+# (X360 naming: A, B, X, Y, LB, RB, BACK, START, L3, R3).
+BUTTON_ORDER = (
+    "cross", "circle", "square", "triangle",
+    "l1", "r1",
+    "share", "option",
+    "l3", "r3",
+)
+
+AXIS_ORDER = (
+    "left_stick_x", "left_stick_y",
+    "right_stick_x", "right_stick_y",
+    "left_trigger", "right_trigger",
+)
+
+_NO_DPAD = (False, False, False, False)
+
+
+def _parse_int(value, default: int | None = None) -> int | None:
+    """
+    Parse a byte index from a profile value (32, "32", None).
+    """
+    if value is None:
+        return default
+    return int(value)
+
+
+def _parse_mask(value, default: int | None = None) -> int | None:
+    """
+    Parse a bit mask from a profile value. Strings are hex, with or
+    without the 0x prefix ("0x20", "20", "F0"), as profiles always wrote them.
+    """
+    if value is None:
+        return default
+    if isinstance(value, str):
+        return int(value, 16)
+    return int(value)
+
+
+def _hat_directions(hat_val: int) -> Tuple[bool, bool, bool, bool]:
+    """
+    Decode a hat-switch value into (up, down, left, right).
+    """
+    up = hat_val in (0, 1, 7)
+    down = hat_val in (3, 4, 5)
+    right = hat_val in (1, 2, 3)
+    left = hat_val in (5, 6, 7)
+    return up, down, left, right
+
+
+class ProfileDecoder:
+    """
+    A controller profile (profiles/*.json) compiled into a flat decoder.
+
+    All dict lookups and hex mask parsing happen once in __init__. decode()
+    then only indexes bytes and masks integers. Fields the profile does not
+    define are compiled to (0, mask 0) so they always read as 0 without any
+    branching at decode time.
+    """
+
+    __slots__ = (
+        "min_length",
+        "_axes",
+        "_buttons",
+        "_hat_index",
+        "_hat_mask",
+        "_hat_table",
+        "_battery",
+        "_button_fields",
+        "_relevant_fields",
+    )
+
+    def __init__(self, config: dict):
+        config = config or {}
+        axes_cfg = config.get("axes", {}) or {}
+        buttons_cfg = config.get("buttons", {}) or {}
+        dpad_cfg = config.get("dpad_hat") or None
+        battery_cfg = (config.get("battery_status", {}) or {}).get("percent") or None
+
+        used = []
+
+        # Axes: (byte index, mask)
+        axes = []
+        for name in AXIS_ORDER:
+            idx = _parse_int((axes_cfg.get(name) or {}).get("byte"))
+            if idx is None:
+                axes.append((0, 0))
+            else:
+                axes.append((idx, 0xFF))
+                used.append(idx)
+        self._axes = tuple(axes)
+
+        # Buttons: (byte index, mask, expected value or -1 for "any bit set")
+        buttons = []
+        for name in BUTTON_ORDER:
+            cfg = buttons_cfg.get(name) or {}
+            idx = _parse_int(cfg.get("index", cfg.get("byte")))
+            if idx is None:
+                buttons.append((0, 0, -1))
+                continue
+            mask = _parse_mask(cfg.get("mask"), 0xFF)
+            expected = int(cfg["value"]) if "value" in cfg else -1
+            buttons.append((idx, mask, expected))
+            used.append(idx)
+        self._buttons = tuple(buttons)
+
+        # Hat switch: precomputed direction table indexed by masked value
+        hat_idx = _parse_int(dpad_cfg.get("byte")) if dpad_cfg else None
+        if hat_idx is not None:
+            self._hat_index = hat_idx
+            self._hat_mask = _parse_mask(dpad_cfg.get("mask"), 0x0F)
+            self._hat_table = tuple(_hat_directions(v) for v in range(self._hat_mask + 1))
+            used.append(hat_idx)
+        else:
+            self._hat_index = 0
+            self._hat_mask = 0
+            self._hat_table = (_NO_DPAD,)
+
+        battery_idx = _parse_int(battery_cfg.get("byte")) if battery_cfg else None
+        if battery_idx is not None:
+            self._battery = (battery_idx, 0xFF)
+            used.append(battery_idx)
+        else:
+            self._battery = (0, 0)
+
+        # Bits the profile reads, merged per byte, for cheap change detection
+        merged = {}
+        for idx, mask, _ in self._buttons:
+            if mask:
+                merged[idx] = merged.get(idx, 0) | mask
+        if self._hat_mask:
+            merged[self._hat_index] = merged.get(self._hat_index, 0) | self._hat_mask
+        self._button_fields = tuple(sorted(merged.items()))
+
+        for idx, mask in (*self._axes, self._battery):
+            if mask:
+                merged[idx] = merged.get(idx, 0) | mask
+        self._relevant_fields = tuple(sorted(merged.items()))
+
+        # Undefined fields read byte 0, so always require at least one byte
+        self.min_length = max(used) + 1 if used else 1
+
+    def decode(self, report: bytes) -> tuple:
+        """
+        Decode a raw HID report.
+
+        Bytes the profile does not define, or that lie past the end of a
+        short report, read as 0.
+
+        :return: (ljx, ljy, rjx, rjy, lt, rt, battery,
+                  a, b, x, y, lb, rb, back, start, l3, r3,
+                  dpu, dpd, dpl, dpr)
+        """
+        if len(report) < self.min_length:
+            report = bytes(report) + bytes(self.min_length - len(report))
+
+        axes = [report[idx] & mask for idx, mask in self._axes]
+
+        idx, mask = self._battery
+        battery = report[idx] & mask
+
+        buttons = [
+            (report[idx] & mask) == expected if expected >= 0 else (report[idx] & mask) != 0
+            for idx, mask, expected in self._buttons
+        ]
+
+        dpad = self._hat_table[report[self._hat_index] & self._hat_mask]
+
+        return (*axes, battery, *buttons, *dpad)
+
+    def button_state(self, report: bytes) -> tuple:
+        """
+        Return only the button and D-pad bits of a report.
+
+        Two reports with equal button_state() decode to the same buttons,
+        so this is a cheap edge key for HIDWorker's coalesce mode.
+        """
+        if len(report) < self.min_length:
+            report = bytes(report) + bytes(self.min_length - len(report))
+        return tuple([report[idx] & mask for idx, mask in self._button_fields])
+
+    def relevant_state(self, report: bytes) -> tuple:
+        """
+        Return every bit of a report that decode() looks at.
+
+        Two reports with equal relevant_state() decode identically.
+        """
+        if len(report) < self.min_length:
+            report = bytes(report) + bytes(self.min_length - len(report))
+        return tuple([report[idx] & mask for idx, mask in self._relevant_fields])
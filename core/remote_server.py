@@ -0,0 +1,590 @@
+"""
+Remote gamepad server: phones connect over TCP, authenticate with a
+one-time code (or as a trusted client) and then stream controller state.
+
+All connections are served by one asyncio event loop. The loop runs either
+on a background thread (start()/stop(), used by the GUI) or in the calling
+thread (run(), used headless). Nothing here imports Qt: UI updates leave
+through a single `on_events(list)` callback, called at most once per loop
+iteration with every event queued since the last call.
+
+Optionally, input frames can also arrive over UDP (udp_port): the auth_ok
+reply then carries the UDP port and a per-session token. A datagram is the
+8-byte token followed by one binary input frame; frames that are not newer
+than the last one applied (by sequence number) are dropped. TCP remains
+the control and authentication channel.
+
+Input is not applied as it is parsed. Each session keeps a small mailbox
+of pending states that is drained once per loop iteration: a state that
+only moves sticks or triggers replaces the pending one, while a state
+that changes buttons is queued behind it, so a burst of buffered messages
+costs one mapper update unless it contains button presses or releases.
+
+Run standalone for testing (authentication and logging only):
+    python -m core.remote_server --port 5000
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import socket
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from core import latency
+from core.framing import LineFramer, LineTooLong
+from core.input_frame import FIXED_FRAMES, FRAME_V1_MAGIC, frame_to_state, negotiate, seq_newer, unpack_v1
+
+
+HOST = "0.0.0.0"
+PORT = 5000
+UDP_PORT = 5000     # UDP input channel (same number, different protocol)
+TRUSTED_FILE = "trusted_clients.json"
+AUTH_TIMEOUT = 120  # seconds to enter the code shown on the server
+MAX_LINE = 4096     # longest JSON message accepted from a client, in bytes
+UDP_TOKEN_SIZE = 8
+
+# Events passed to on_events as (kind, *args)
+EVENT_CONNECTED = "connected"              # (kind, addr)
+EVENT_DISCONNECTED = "disconnected"        # (kind, addr)
+EVENT_UUID_UPDATED = "uuid_updated"        # (kind, addr, uuid)
+EVENT_AUTH_CODE = "auth_code"              # (kind, addr, code, time_left); code "" clears it
+EVENT_TRUSTED_ADDED = "trusted_added"      # (kind, name)
+
+# Per-connection states
+STATE_HELLO = "hello"                      # connected, nothing received yet
+STATE_AUTH_PENDING = "auth_pending"        # code shown, waiting for it
+STATE_AUTHENTICATED = "authenticated"      # streaming input
+STATE_CLOSED = "closed"
+
+
+# ---------------------------------------------------------
+
+def get_local_ip():
+    try:
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        s.connect(("8.8.8.8", 80))
+        ip = s.getsockname()[0]
+        s.close()
+    except Exception:
+        ip = "Unavailable"
+    return f"{ip}:{PORT}"
+
+
+def hash_uuid(uuid_str: str) -> str:
+    return hashlib.sha256(uuid_str.encode("utf-8")).hexdigest()
+
+
+def load_trusted() -> dict:
+    if os.path.exists(TRUSTED_FILE):
+        try:
+            with open(TRUSTED_FILE, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            pass
+    return {}
+
+
+def save_trusted(trusted_data: dict):
+    with open(TRUSTED_FILE, "w", encoding="utf-8") as f:
+        json.dump(trusted_data, f, indent=4)
+
+
+class ClientSession(asyncio.Protocol):
+    """
+    One phone connection, driven through STATE_HELLO -> STATE_AUTH_PENDING
+    -> STATE_AUTHENTICATED -> STATE_CLOSED (any state may go straight to
+    STATE_CLOSED; trusted clients skip STATE_AUTH_PENDING).
+    """
+
+    def __init__(self, server: "RemoteGamepadServer"):
+        self.server = server
+        self.transport = None
+        self.addr = None
+        self.state = STATE_HELLO
+        self.uuid = "unknown"
+        self.name = "UnknownDevice"
+        self.auth_code: Optional[str] = None
+        self.auth_time_left = 0
+        self.mapper = None
+        # binary frame version agreed at authentication (0 = JSON only)
+        self.frame_version = 0
+        self.last_seq = None
+        self.stale_frames = 0
+        self.udp_token: Optional[bytes] = None
+        # pending input as (state, recv_ns, posted_ns), drained by
+        # _apply_input() (see post_input())
+        self._pending_input: List[tuple] = []
+        self._apply_scheduled = False
+        self.superseded_states = 0
+        # perf_counter_ns of the data being handled, for latency tracing
+        self.recv_ns = 0
+        self._framer = LineFramer(server.max_line, FIXED_FRAMES)
+
+    # -------------------------------------------------------------------------
+    # asyncio.Protocol
+    # -------------------------------------------------------------------------
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.addr = transport.get_extra_info("peername")[:2]
+        self.server._register(self)
+
+    def data_received(self, data: bytes):
+        self.recv_ns = time.perf_counter_ns()
+        try:
+            lines = self._framer.feed(data)
+        except LineTooLong as e:
+            print(f"[{self.addr}] Dropping client: {e}")
+            self.close()
+            return
+
+        for line in lines:
+            if self.state == STATE_CLOSED:
+                break
+            if not line or line.isspace():
+                continue
+            if line[0] == FRAME_V1_MAGIC:
+                self.handle_frame(line)
+                continue
+            try:
+                msg = json.loads(line)
+            except ValueError:
+                # Ignore malformed messages (bad JSON or bad UTF-8)
+                continue
+            if isinstance(msg, dict):
+                self.handle_message(msg)
+
+    def connection_lost(self, exc):
+        self.state = STATE_CLOSED
+        self.server._stop_mapper(self)
+        self.server._unregister(self)
+
+    # -------------------------------------------------------------------------
+    # State machine
+    # -------------------------------------------------------------------------
+
+    def close(self) -> None:
+        if self.state != STATE_CLOSED:
+            self.state = STATE_CLOSED
+            if self.transport is not None:
+                self.transport.close()
+
+    def handle_message(self, msg: dict) -> None:
+        client_uuid = msg.get("uuid", "unknown")
+        if client_uuid != "unknown" and client_uuid != self.uuid:
+            self.uuid = client_uuid
+            self.server._emit(EVENT_UUID_UPDATED, self.addr, self.uuid)
+        self.name = msg.get("name", self.name)
+
+        if self.state in (STATE_HELLO, STATE_AUTH_PENDING):
+            if not self._authenticate(msg):
+                # Skip input until authenticated
+                return
+
+        if self.state == STATE_AUTHENTICATED:
+            self.post_input(
+                {
+                    "buttons": msg.get("buttons", {}),
+                    "analog": msg.get("analog", {}),
+                    "joystick": msg.get("joystick", {}),
+                }
+            )
+
+    def handle_frame(self, frame) -> None:
+        """
+        Handle one binary input frame (only valid once negotiated), from
+        TCP or UDP. Frames not newer than the last applied are dropped.
+        """
+        if self.state != STATE_AUTHENTICATED or not self.frame_version:
+            return
+        try:
+            unpacked = unpack_v1(frame)
+        except ValueError:
+            return
+
+        seq = unpacked[0]
+        if self.last_seq is not None and not seq_newer(seq, self.last_seq):
+            self.stale_frames += 1
+            return
+        self.last_seq = seq
+        self.post_input(frame_to_state(unpacked))
+
+    def post_input(self, state: dict) -> None:
+        """
+        Queue a state for the mapper. It replaces the newest pending state
+        if both have the same buttons (only axes moved); otherwise it is
+        queued after it, so every button edge still reaches the mapper.
+        """
+        entry = (state, self.recv_ns, time.perf_counter_ns())
+        pending = self._pending_input
+        if pending and pending[-1][0]["buttons"] == state["buttons"]:
+            pending[-1] = entry
+            self.superseded_states += 1
+        else:
+            pending.append(entry)
+
+        if not self._apply_scheduled:
+            self._apply_scheduled = True
+            self.server.loop.call_soon(self._apply_input)
+
+    def _apply_input(self) -> None:
+        self._apply_scheduled = False
+        pending, self._pending_input = self._pending_input, []
+        if self.state != STATE_AUTHENTICATED:
+            return
+        for state, recv_ns, posted_ns in pending:
+            self.server._input(self, state, recv_ns, posted_ns)
+
+    def _authenticate(self, msg: dict) -> bool:
+        """
+        Advance authentication with one message. Returns True if the
+        message should also be treated as input (trusted clients).
+        """
+        server = self.server
+        hashed_id = hash_uuid(self.uuid)
+
+        if server.trusted_data.get(self.name) == hashed_id:
+            # Already trusted
+            self._set_authenticated(msg)
+            return True
+
+        received_code = msg.get("auth_code")
+        if received_code:
+            if self.auth_code and str(received_code) == self.auth_code:
+                server.trusted_data[self.name] = hashed_id
+                save_trusted(server.trusted_data)
+                server._emit(EVENT_TRUSTED_ADDED, self.name)
+                self._set_authenticated(msg)
+            else:
+                print(f"[{self.addr}] Invalid auth code: {received_code}")
+            return False
+
+        # No auth_code received yet: generate once and show
+        if self.state == STATE_HELLO:
+            self.auth_code = str(random.randint(1000, 9999))
+            self.auth_time_left = server.auth_timeout
+            self.state = STATE_AUTH_PENDING
+            server._emit(EVENT_AUTH_CODE, self.addr, self.auth_code, self.auth_time_left)
+        return False
+
+    def _set_authenticated(self, msg: dict) -> None:
+        self.state = STATE_AUTHENTICATED
+        # clear any auth code in the UI
+        self.server._emit(EVENT_AUTH_CODE, self.addr, "", 0)
+        latency.trace_for(self.uuid, f"{self.name} ({self.uuid})")
+        self.mapper = self.server._make_mapper(self.uuid)
+
+        # tell the client, and switch to binary frames if it offered any
+        self.frame_version = negotiate(msg.get("frames") or ())
+        reply = {"type": "auth_ok", "frame_version": self.frame_version}
+        if self.frame_version and self.server.udp_port is not None:
+            self.udp_token = self.server._issue_udp_token(self)
+            reply["udp_port"] = self.server.udp_port
+            reply["udp_token"] = self.udp_token.hex()
+        self.send_json(reply)
+
+    def send_json(self, obj: dict) -> None:
+        if self.transport is not None and self.state != STATE_CLOSED:
+            self.transport.write((json.dumps(obj) + "\n").encode("utf-8"))
+
+    def tick(self) -> None:
+        """
+        Called once a second: count down a pending auth code.
+        """
+        if self.state != STATE_AUTH_PENDING:
+            return
+        if self.auth_time_left > 0:
+            self.auth_time_left -= 1
+        self.server._emit(EVENT_AUTH_CODE, self.addr, self.auth_code, self.auth_time_left)
+        if self.auth_time_left <= 0:
+            # expired
+            self.server._emit(EVENT_AUTH_CODE, self.addr, "", 0)
+            self.close()
+
+
+class InputDatagramProtocol(asyncio.DatagramProtocol):
+    """
+    UDP input channel: each datagram is a session token plus one frame.
+    Datagrams with an unknown token, from another host than the session's
+    TCP connection, or carrying a stale frame are dropped.
+    """
+
+    def __init__(self, server: "RemoteGamepadServer"):
+        self.server = server
+        self.dropped = 0
+
+    def datagram_received(self, data: bytes, addr):
+        session = self.server.udp_sessions.get(data[:UDP_TOKEN_SIZE])
+        if session is None or addr[0] != session.addr[0]:
+            self.dropped += 1
+            return
+        session.recv_ns = time.perf_counter_ns()
+        session.handle_frame(memoryview(data)[UDP_TOKEN_SIZE:])
+
+    def error_received(self, exc):
+        pass
+
+
+class RemoteGamepadServer:
+    """
+    asyncio server for phone clients.
+
+    :param mapper_factory: Called with the client uuid once a client
+        authenticates; returns an object with handle_hid_data(dict)
+        (usually a Phone_mapper), or None to only log input.
+    :param on_events: Called with a list of event tuples (see EVENT_*),
+        on the event-loop thread. The GUI forwards it through one queued
+        Qt signal.
+    :param trusted_data: {name: hash_uuid(uuid)} of trusted clients,
+        shared with the caller. Loaded from TRUSTED_FILE if omitted.
+    :param udp_port: Also accept input frames over UDP on this port
+        (0 = any free port); None disables UDP.
+    """
+
+    def __init__(
+        self,
+        host: str = HOST,
+        port: int = PORT,
+        mapper_factory: Optional[Callable[[str], object]] = None,
+        on_events: Optional[Callable[[List[tuple]], None]] = None,
+        trusted_data: Optional[dict] = None,
+        auth_timeout: int = AUTH_TIMEOUT,
+        max_line: int = MAX_LINE,
+        udp_port: Optional[int] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.mapper_factory = mapper_factory
+        self.on_events = on_events
+        self.trusted_data = load_trusted() if trusted_data is None else trusted_data
+        self.auth_timeout = auth_timeout
+        self.max_line = max_line
+        self.udp_port = udp_port
+
+        self.sessions: Dict[tuple, ClientSession] = {}
+        self.udp_sessions: Dict[bytes, ClientSession] = {}  # udp token -> session
+        self._udp_transport = None
+        # conn_key (addr) -> forward input to the mapper
+        self.emulation_states: Dict[tuple, bool] = {}
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped: Optional[asyncio.Event] = None
+        self._listening = False
+        self._ready = threading.Event()     # set once listening, or once startup failed
+        self._error: Optional[BaseException] = None
+        self._events: List[tuple] = []
+
+    # -------------------------------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------------------------------
+
+    async def serve(self) -> None:
+        """
+        Listen and serve until stop() is called.
+        """
+        self.loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        self._server = await self.loop.create_server(
+            lambda: ClientSession(self), self.host, self.port, reuse_address=True
+        )
+        if not self.port:
+            self.port = self._server.sockets[0].getsockname()[1]
+        if self.udp_port is not None:
+            self._udp_transport, _ = await self.loop.create_datagram_endpoint(
+                lambda: InputDatagramProtocol(self), local_addr=(self.host, self.udp_port)
+            )
+            if not self.udp_port:
+                self.udp_port = self._udp_transport.get_extra_info("sockname")[1]
+        self._listening = True
+        self._ready.set()
+
+        ticker = asyncio.ensure_future(self._tick_loop())
+        try:
+            await self._stopped.wait()
+        finally:
+            ticker.cancel()
+            self._server.close()
+            if self._udp_transport is not None:
+                self._udp_transport.close()
+                self._udp_transport = None
+            for session in list(self.sessions.values()):
+                session.close()
+                # connection_lost() may not run before the loop ends
+                self._stop_mapper(session)
+            await self._server.wait_closed()
+            self._listening = False
+
+    def run(self) -> None:
+        """
+        Serve in the calling thread (headless use).
+        """
+        asyncio.run(self.serve())
+
+    def start(self) -> None:
+        """
+        Serve on a background thread; returns once listening.
+
+        :raises OSError: If the server could not listen (e.g. port in use).
+        """
+        if self._thread is not None:
+            return
+        self._ready.clear()
+        self._error = None
+        self._thread = threading.Thread(target=self._thread_main, name="RemoteGamepadServer", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+        if self._error is not None:
+            self._thread.join()
+            self._thread = None
+            raise self._error
+
+    def _thread_main(self) -> None:
+        try:
+            self.run()
+        except Exception as e:
+            self._error = e
+        finally:
+            self._ready.set()
+
+    def stop(self) -> None:
+        """
+        Close every connection, stop the client mappers and stop serving.
+        Safe from any thread.
+        """
+        if self.loop is not None and self._stopped is not None:
+            try:
+                self.loop.call_soon_threadsafe(self._stopped.set)
+            except RuntimeError:
+                pass    # loop already closed
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._listening
+
+    # -------------------------------------------------------------------------
+    # Control (any thread)
+    # -------------------------------------------------------------------------
+
+    def set_emulating(self, conn_key: tuple, enabled: bool) -> None:
+        self.emulation_states[conn_key] = bool(enabled)
+
+    def disconnect(self, conn_key: tuple) -> None:
+        session = self.sessions.get(conn_key)
+        if session is not None and self.loop is not None:
+            self.loop.call_soon_threadsafe(session.close)
+
+    # -------------------------------------------------------------------------
+    # Session callbacks (event-loop thread)
+    # -------------------------------------------------------------------------
+
+    def _register(self, session: ClientSession) -> None:
+        self.sessions[session.addr] = session
+        self.emulation_states.setdefault(session.addr, False)
+        self._emit(EVENT_CONNECTED, session.addr)
+
+    def _unregister(self, session: ClientSession) -> None:
+        if self.sessions.get(session.addr) is session:
+            del self.sessions[session.addr]
+        if session.udp_token is not None:
+            self.udp_sessions.pop(session.udp_token, None)
+        self.emulation_states.pop(session.addr, None)
+        self._emit(EVENT_DISCONNECTED, session.addr)
+
+    def _issue_udp_token(self, session: ClientSession) -> bytes:
+        token = os.urandom(UDP_TOKEN_SIZE)
+        while token in self.udp_sessions:
+            token = os.urandom(UDP_TOKEN_SIZE)
+        self.udp_sessions[token] = session
+        return token
+
+    def _make_mapper(self, uuid: str):
+        if self.mapper_factory is None:
+            return None
+        try:
+            return self.mapper_factory(uuid)
+        except Exception as e:
+            print(f"[RemoteGamepadServer] Could not create mapper for {uuid}: {e}")
+            return None
+
+    def _stop_mapper(self, session: ClientSession) -> None:
+        """
+        Stop the session's mapper (releasing its virtual pad) once.
+        """
+        mapper, session.mapper = session.mapper, None
+        if mapper is None:
+            return
+        try:
+            mapper.stop()
+        except Exception as e:
+            print(f"[RemoteGamepadServer] Could not stop mapper for {session.addr}: {e}")
+
+    def _input(self, session: ClientSession, state: dict, recv_ns: int = 0, posted_ns: int = 0) -> None:
+        if session.mapper is None or not self.emulation_states.get(session.addr, False):
+            return
+        trace = latency.trace_for(session.uuid)
+        if trace.enabled:
+            # receive -> parsed, then the mailbox wait until the mapper runs
+            trace.sent(recv_ns, posted_ns)
+        try:
+            session.mapper.handle_hid_data(state)
+        except Exception as e:
+            print(f"[RemoteGamepadServer] Mapper failed for {session.addr}: {e}")
+
+    def _emit(self, kind: str, *args) -> None:
+        """
+        Queue an event; queued events are delivered together once the
+        current loop iteration finishes.
+        """
+        if not self._events:
+            self.loop.call_soon(self._flush_events)
+        self._events.append((kind, *args))
+
+    def _flush_events(self) -> None:
+        events, self._events = self._events, []
+        if self.on_events is not None and events:
+            try:
+                self.on_events(events)
+            except Exception as e:
+                print(f"[RemoteGamepadServer] Event handler failed: {e}")
+
+    async def _tick_loop(self) -> None:
+        while True:
+            await asyncio.sleep(1.0)
+            for session in list(self.sessions.values()):
+                session.tick()
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Remote gamepad server (no GUI, no emulation)")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    args = parser.parse_args(argv)
+
+    def print_events(events):
+        for event in events:
+            print("[RemoteGamepadServer]", *event)
+
+    server = RemoteGamepadServer(args.host, args.port, on_events=print_events)
+    print(f"[RemoteGamepadServer] Listening on {args.host}:{args.port}")
+    latency.install_dump_signal()
+    try:
+        server.run()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,6 +1,79 @@
 import configparser
 from pathlib import Path
 
+from core.stick_curve import DEFAULT_CURVE, parse_curve
+
+# valid [device] input_backend values (see core.hid)
+INPUT_BACKENDS = ("hidapi", "hidraw", "multiplex")
+
+
+def parse_device_list(value: str):
+    """
+    Parse a [headless] devices value: "auto" (every supported controller,
+    returns None), "none" (returns []) or comma-separated vid:pid pairs in
+    hex, e.g. "054c:09cc, 054c:0ce6".
+
+    :raises ValueError: On a malformed entry.
+    """
+    value = value.strip().lower()
+    if value == "auto":
+        return None
+    if value in ("", "none"):
+        return []
+    devices = []
+    for entry in value.split(","):
+        vid, sep, pid = entry.strip().partition(":")
+        if not sep:
+            raise ValueError(f"Expected vid:pid, got {entry.strip()!r}")
+        devices.append((int(vid, 16), int(pid, 16)))
+    return devices
+
+
+class SettingsSnapshot:
+    """
+    Immutable view of the device settings the mappers read on every report.
+
+    Built by SettingsManager whenever a setter or save() runs, so the hot
+    path reads plain attributes instead of going through configparser.
+    """
+
+    __slots__ = (
+        "generation",
+        "left_deadzone",
+        "right_deadzone",
+        "left_invert",
+        "right_invert",
+        "left_curve",
+        "right_curve",
+        "invert_buttons",
+        "mouse_mode",
+        "mouse_sensitivity",
+    )
+
+    def __init__(self, generation, deadzones, joystick_invertion, stick_curves, invert_buttons, mouse_mode, mouse_sensitivity):
+        setattr_ = object.__setattr__
+        setattr_(self, "generation", generation)
+        setattr_(self, "left_deadzone", deadzones[0])
+        setattr_(self, "right_deadzone", deadzones[1])
+        setattr_(self, "left_invert", tuple(joystick_invertion[0]))
+        setattr_(self, "right_invert", tuple(joystick_invertion[1]))
+        setattr_(self, "left_curve", stick_curves[0])
+        setattr_(self, "right_curve", stick_curves[1])
+        setattr_(self, "invert_buttons", invert_buttons)
+        setattr_(self, "mouse_mode", mouse_mode)
+        setattr_(self, "mouse_sensitivity", mouse_sensitivity)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("SettingsSnapshot is read-only")
+
+    def __delattr__(self, name):
+        raise AttributeError("SettingsSnapshot is read-only")
+
+    def __repr__(self):
+        fields = ", ".join(f"{k}={getattr(self, k)!r}" for k in self.__slots__)
+        return f"SettingsSnapshot({fields})"
+
+
 class SettingsManager:
     def __init__(self, path="config/settings.conf"):
         self.path = Path(path)
@@ -18,8 +91,13 @@ class SettingsManager:
                 "right_stick_invert_y": "false",
                 "left_stick_invert_x": "false",
                 "left_stick_invert_y": "true",
+                "left_stick_curve": DEFAULT_CURVE,
+                "right_stick_curve": DEFAULT_CURVE,
                 "mouse_mode": "false",
-                "mouse_sensitivity": "1.0"
+                "mouse_sensitivity": "1.0",
+                "coalesce_reports": "false",
+                "direct_pipeline": "false",
+                "input_backend": "hidapi"
             }
             self.config["ui"] = {
                 "language": "eng",
@@ -31,11 +109,55 @@ class SettingsManager:
                 "log_to_file": "false",
                 "log_file_path": "logs/mapper.log"
             }
+            self.config["headless"] = {
+                "devices": "auto",
+                "server": "true",
+                "server_port": "5000"
+            }
             with self.path.open("w", encoding="utf-8") as f:
                 self.config.write(f)
 
         self.config.read(self.path)
 
+        self.generation = 0
+        self._snapshot = None
+        self._touch()
+
+    # -------- snapshot --------
+    def snapshot(self) -> SettingsSnapshot:
+        """
+        Return the current immutable settings snapshot.
+
+        This is a plain attribute read; the snapshot is rebuilt by the
+        setters and save(), never here.
+        """
+        return self._snapshot
+
+    def _touch(self):
+        """
+        Bump the generation counter and rebuild the snapshot.
+
+        Values that fail to parse fall back to their defaults here so a bad
+        config file can still be repaired by normalize().
+        """
+        self.generation += 1
+        self._snapshot = SettingsSnapshot(
+            self.generation,
+            self._get_or_default(self.get_deadzones, (0.1, 0.1)),
+            self._get_or_default(self.get_joystick_invertion, ((False, False), (False, False))),
+            self._get_or_default(self.get_stick_curves, (DEFAULT_CURVE, DEFAULT_CURVE)),
+            self._get_or_default(self.get_button_invertion, False),
+            self._get_or_default(self.get_mouse_mode, False),
+            self._get_or_default(self.get_mouse_sensitivity, 1.0),
+        )
+
+    @staticmethod
+    def _get_or_default(getter, default):
+        try:
+            return getter()
+        except ValueError:
+            return default
+
     # -------- device --------
     def get_polling_rate(self):
         return self.config.getfloat("device", "polling_rate", fallback=1.0)
@@ -44,6 +166,7 @@ class SettingsManager:
         if not self.config.has_section("device"):
             self.config.add_section("device")
         self.config.set("device", "polling_rate", str(float(v)))
+        self._touch()
 
     def get_auto_reconnect(self):
         return self.config.getboolean("device", "auto_reconnect", fallback=False)
@@ -52,6 +175,7 @@ class SettingsManager:
         if not self.config.has_section("device"):
             self.config.add_section("device")
         self.config.set("device", "auto_reconnect", "true" if enabled else "false")
+        self._touch()
 
     def get_dpad_as_mouse(self):
         return self.config.getboolean("device", "dpad_as_mouse", fallback=True)
@@ -60,6 +184,7 @@ class SettingsManager:
         if not self.config.has_section("device"):
             self.config.add_section("device")
         self.config.set("device", "dpad_as_mouse", "true" if enabled else "false")
+        self._touch()
 
     def get_deadzones(self):
         left = self.config.getfloat("device", "left_stick_deadzone", fallback=0.1)
@@ -75,6 +200,7 @@ class SettingsManager:
         right = max(0.0, min(1.0, float(right)))
         self.config.set("device", "left_stick_deadzone", f"{left:.6f}")
         self.config.set("device", "right_stick_deadzone", f"{right:.6f}")
+        self._touch()
 
     def get_joystick_invertion(self):
         left_x = self.config.getboolean("device", "left_stick_invert_x", fallback=False)
@@ -90,11 +216,30 @@ class SettingsManager:
         self.config.set("device", "left_stick_invert_y", "true" if bool(left[1]) else "false")
         self.config.set("device", "right_stick_invert_x", "true" if bool(right[0]) else "false")
         self.config.set("device", "right_stick_invert_y", "true" if bool(right[1]) else "false")
+        self._touch()
+
+    def get_stick_curves(self):
+        left = self.config.get("device", "left_stick_curve", fallback=DEFAULT_CURVE)
+        right = self.config.get("device", "right_stick_curve", fallback=DEFAULT_CURVE)
+        # validate so a typo surfaces here instead of silently going linear
+        parse_curve(left)
+        parse_curve(right)
+        return left, right
+
+    def set_stick_curves(self, left: str, right: str):
+        if not self.config.has_section("device"):
+            self.config.add_section("device")
+        parse_curve(left)
+        parse_curve(right)
+        self.config.set("device", "left_stick_curve", str(left))
+        self.config.set("device", "right_stick_curve", str(right))
+        self._touch()
 
     def set_button_invertion(self, invert):
         if not self.config.has_section("device"):
             self.config.add_section("device")
         self.config.set("device", "invert_buttons", "true" if bool(invert) else "false")
+        self._touch()
     
     def get_button_invertion(self):
         return self.config.getboolean("device", "invert_buttons", fallback=False)
@@ -106,6 +251,7 @@ class SettingsManager:
         if not self.config.has_section("device"):
             self.config.add_section("device")
         self.config.set("device", "mouse_mode", "true" if enabled else "false")
+        self._touch()
 
     def get_mouse_sensitivity(self):
         return self.config.getfloat("device", "mouse_sensitivity", fallback=1.0)
@@ -114,6 +260,36 @@ class SettingsManager:
         if not self.config.has_section("device"):
             self.config.add_section("device")
         self.config.set("device", "mouse_sensitivity", f"{float(sens):.6f}")
+        self._touch()
+
+    def get_coalesce_reports(self):
+        return self.config.getboolean("device", "coalesce_reports", fallback=False)
+
+    def set_coalesce_reports(self, enabled: bool):
+        if not self.config.has_section("device"):
+            self.config.add_section("device")
+        self.config.set("device", "coalesce_reports", "true" if enabled else "false")
+        self._touch()
+
+    def get_direct_pipeline(self):
+        return self.config.getboolean("device", "direct_pipeline", fallback=False)
+
+    def set_direct_pipeline(self, enabled: bool):
+        if not self.config.has_section("device"):
+            self.config.add_section("device")
+        self.config.set("device", "direct_pipeline", "true" if enabled else "false")
+        self._touch()
+
+    def get_input_backend(self):
+        return self.config.get("device", "input_backend", fallback="hidapi")
+
+    def set_input_backend(self, backend: str):
+        if backend not in INPUT_BACKENDS:
+            raise ValueError(f"input_backend must be one of {INPUT_BACKENDS}")
+        if not self.config.has_section("device"):
+            self.config.add_section("device")
+        self.config.set("device", "input_backend", backend)
+        self._touch()
 
     # -------- ui --------
     def get_ui_language(self):
@@ -123,6 +299,7 @@ class SettingsManager:
         if not self.config.has_section("ui"):
             self.config.add_section("ui")
         self.config.set("ui", "language", str(lang))
+        self._touch()
 
     def get_ui_theme(self):
         return self.config.get("ui", "theme", fallback="dark")
@@ -131,6 +308,7 @@ class SettingsManager:
         if not self.config.has_section("ui"):
             self.config.add_section("ui")
         self.config.set("ui", "theme", str(theme_name))
+        self._touch()
 
     # -------- developer --------
     def get_developer_debug(self):
@@ -140,6 +318,7 @@ class SettingsManager:
         if not self.config.has_section("developer"):
             self.config.add_section("developer")
         self.config.set("developer", "debug", "true" if enabled else "false")
+        self._touch()
 
     def get_raw_hid_debug(self):
         return self.config.getboolean("developer", "raw_hid_debug", fallback=False)
@@ -148,6 +327,7 @@ class SettingsManager:
         if not self.config.has_section("developer"):
             self.config.add_section("developer")
         self.config.set("developer", "raw_hid_debug", "true" if enabled else "false")
+        self._touch()
 
     def get_log_to_file(self):
         return self.config.getboolean("developer", "log_to_file", fallback=False)
@@ -156,6 +336,7 @@ class SettingsManager:
         if not self.config.has_section("developer"):
             self.config.add_section("developer")
         self.config.set("developer", "log_to_file", "true" if enabled else "false")
+        self._touch()
 
     def get_log_file_path(self):
         return self.config.get("developer", "log_file_path", fallback="logs/mapper.log")
@@ -164,12 +345,49 @@ class SettingsManager:
         if not self.config.has_section("developer"):
             self.config.add_section("developer")
         self.config.set("developer", "log_file_path", str(path))
+        self._touch()
+
+    # -------- headless (core.daemon) --------
+    def get_headless_devices(self):
+        """
+        None for "auto", otherwise a list of (vendor_id, product_id).
+        """
+        return parse_device_list(self.config.get("headless", "devices", fallback="auto"))
+
+    def set_headless_devices(self, value: str):
+        parse_device_list(value)
+        if not self.config.has_section("headless"):
+            self.config.add_section("headless")
+        self.config.set("headless", "devices", value.strip().lower())
+        self._touch()
+
+    def get_headless_server(self):
+        return self.config.getboolean("headless", "server", fallback=True)
+
+    def set_headless_server(self, enabled: bool):
+        if not self.config.has_section("headless"):
+            self.config.add_section("headless")
+        self.config.set("headless", "server", "true" if enabled else "false")
+        self._touch()
+
+    def get_headless_server_port(self):
+        return self.config.getint("headless", "server_port", fallback=5000)
+
+    def set_headless_server_port(self, port: int):
+        port = int(port)
+        if not 0 < port < 65536:
+            raise ValueError("server_port must be between 1 and 65535")
+        if not self.config.has_section("headless"):
+            self.config.add_section("headless")
+        self.config.set("headless", "server_port", str(port))
+        self._touch()
 
     # -------- save/load --------
     def save(self):
         self.path.parent.mkdir(parents=True, exist_ok=True)
         with self.path.open("w", encoding="utf-8") as f:
             self.config.write(f)
+        self._touch()
 
     # -------- normalization (ensure all keys exist and sane) --------
     def normalize(self):
@@ -207,6 +425,12 @@ class SettingsManager:
             self.set_joystick_invertion(left_inv, right_inv)
         except Exception:
             self.set_joystick_invertion((False, True), (False, False))
+        # stick response curves
+        try:
+            left_curve, right_curve = self.get_stick_curves()
+            self.set_stick_curves(left_curve, right_curve)
+        except Exception:
+            self.set_stick_curves(DEFAULT_CURVE, DEFAULT_CURVE)
         # button inversion
         try:
             inv_btn = self.get_button_invertion()
@@ -223,6 +447,19 @@ class SettingsManager:
             self.set_mouse_sensitivity(sens)
         except Exception:
             self.set_mouse_sensitivity(1.0)
+        # report coalescing
+        try:
+            _ = self.get_coalesce_reports()
+        except Exception:
+            self.set_coalesce_reports(False)
+        try:
+            _ = self.get_direct_pipeline()
+        except Exception:
+            self.set_direct_pipeline(False)
+        try:
+            self.set_input_backend(self.get_input_backend())
+        except Exception:
+            self.set_input_backend("hidapi")
 
         # UI defaults
         if not self.config.has_section("ui"):
@@ -262,5 +499,21 @@ class SettingsManager:
         except Exception:
             self.set_log_file_path("logs/mapper.log")
 
+        # Headless defaults
+        if not self.config.has_section("headless"):
+            self.config.add_section("headless")
+        try:
+            self.set_headless_devices(self.config.get("headless", "devices", fallback="auto"))
+        except Exception:
+            self.set_headless_devices("auto")
+        try:
+            self.set_headless_server(self.get_headless_server())
+        except Exception:
+            self.set_headless_server(True)
+        try:
+            self.set_headless_server_port(self.get_headless_server_port())
+        except Exception:
+            self.set_headless_server_port(5000)
+
         # Write back normalized config
         self.save()
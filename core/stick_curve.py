@@ -0,0 +1,129 @@
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple
+
+
+# Curve spec strings, as stored in settings.conf:
+#   "linear"                     -> output = input
+#   "expo:<k>"                   -> output = (1 - k) * x + k * x^3, k in [0, 1]
+#   "points:x0,y0;x1,y1;..."     -> piecewise linear through (x, y) in [0, 1]
+DEFAULT_CURVE = "linear"
+
+
+def _parse_points(body: str) -> List[Tuple[float, float]]:
+    points = []
+    for pair in body.split(";"):
+        pair = pair.strip()
+        if not pair:
+            continue
+        x_str, y_str = pair.split(",")
+        x = max(0.0, min(1.0, float(x_str)))
+        y = max(0.0, min(1.0, float(y_str)))
+        points.append((x, y))
+
+    points.sort()
+    if not points or points[0][0] > 0.0:
+        points.insert(0, (0.0, 0.0))
+    if points[-1][0] < 1.0:
+        points.append((1.0, 1.0))
+    return points
+
+
+def parse_curve(spec: str) -> Optional[Callable[[float], float]]:
+    """
+    Parse a curve spec into a function mapping [0, 1] -> [0, 1].
+
+    :param spec: Curve spec string (see module comment).
+    :return: The curve function, or None for "linear".
+    :raises ValueError: If the spec is malformed.
+    """
+    spec = (spec or DEFAULT_CURVE).strip().lower()
+
+    if spec == "linear":
+        return None
+
+    kind, _, body = spec.partition(":")
+
+    if kind == "expo":
+        k = max(0.0, min(1.0, float(body or "0.5")))
+        return lambda x: (1.0 - k) * x + k * x * x * x
+
+    if kind == "points":
+        try:
+            points = _parse_points(body)
+        except ValueError as e:
+            raise ValueError(f"Invalid curve points {body!r}: {e}") from None
+
+        def curve(x: float) -> float:
+            for (x0, y0), (x1, y1) in zip(points, points[1:]):
+                if x <= x1:
+                    if x1 == x0:
+                        return y1
+                    return y0 + (y1 - y0) * (x - x0) / (x1 - x0)
+            return points[-1][1]
+
+        return curve
+
+    raise ValueError(f"Unknown stick curve {spec!r}")
+
+
+@lru_cache(maxsize=64)
+def axis_table(deadzone: float, invert: bool, curve: str = DEFAULT_CURVE) -> Tuple[int, ...]:
+    """
+    Build the 256-entry lookup table for one stick axis.
+
+    Entry `v` is the XInput value (-32768..32767) for raw byte `v` after
+    deadzone, optional response curve and inversion.
+
+    :param deadzone: Deadzone as a fraction of full deflection (0..1).
+    :param invert: Invert the axis.
+    :param curve: Curve spec string; invalid specs fall back to linear.
+    """
+    try:
+        shape = parse_curve(curve)
+    except ValueError:
+        shape = None
+
+    table = []
+    for raw in range(256):
+        centered = raw - 128
+        if abs(centered) < deadzone * 127:
+            centered = 0
+
+        normalized = centered / 127.0
+        if shape is not None and centered:
+            magnitude = shape(min(1.0, abs(normalized)))
+            normalized = magnitude if centered > 0 else -magnitude
+        if invert:
+            normalized = -normalized
+
+        scaled = int(round(normalized * 32767.0))
+        table.append(max(-32768, min(32767, scaled)))
+
+    return tuple(table)
+
+
+class StickTables:
+    """
+    The four axis tables for the current settings snapshot.
+
+    Tables are only rebuilt when the snapshot generation changes, so the
+    per-report cost of stick conversion is a single tuple index per axis.
+    """
+
+    __slots__ = ("generation", "left_x", "left_y", "right_x", "right_y")
+
+    def __init__(self):
+        self.generation = -1
+        self.left_x = self.left_y = self.right_x = self.right_y = ()
+
+    def refresh(self, cfg) -> "StickTables":
+        """
+        Rebuild the tables if `cfg` (a SettingsSnapshot) is newer.
+        """
+        if cfg.generation != self.generation:
+            self.left_x = axis_table(cfg.left_deadzone, cfg.left_invert[0], cfg.left_curve)
+            self.left_y = axis_table(cfg.left_deadzone, cfg.left_invert[1], cfg.left_curve)
+            self.right_x = axis_table(cfg.right_deadzone, cfg.right_invert[0], cfg.right_curve)
+            self.right_y = axis_table(cfg.right_deadzone, cfg.right_invert[1], cfg.right_curve)
+            self.generation = cfg.generation
+        return self
@@ -0,0 +1,263 @@
+import os
+import struct
+from typing import List, Optional
+
+from core.virtual_pad import (
+    PadBackend,
+    XUSB_DPAD_UP, XUSB_DPAD_DOWN, XUSB_DPAD_LEFT, XUSB_DPAD_RIGHT,
+    XUSB_START, XUSB_BACK, XUSB_LEFT_THUMB, XUSB_RIGHT_THUMB,
+    XUSB_LEFT_SHOULDER, XUSB_RIGHT_SHOULDER,
+    XUSB_A, XUSB_B, XUSB_X, XUSB_Y,
+)
+
+
+# linux/input-event-codes.h
+EV_SYN = 0x00
+EV_KEY = 0x01
+EV_ABS = 0x03
+SYN_REPORT = 0
+
+BTN_A = 0x130
+BTN_B = 0x131
+BTN_X = 0x133
+BTN_Y = 0x134
+BTN_TL = 0x136
+BTN_TR = 0x137
+BTN_SELECT = 0x13A
+BTN_START = 0x13B
+BTN_THUMBL = 0x13D
+BTN_THUMBR = 0x13E
+
+ABS_X = 0x00
+ABS_Y = 0x01
+ABS_Z = 0x02
+ABS_RX = 0x03
+ABS_RY = 0x04
+ABS_RZ = 0x05
+ABS_HAT0X = 0x10
+ABS_HAT0Y = 0x11
+ABS_CNT = 0x40
+
+# linux/uinput.h
+UI_DEV_CREATE = 0x5501
+UI_DEV_DESTROY = 0x5502
+UI_SET_EVBIT = 0x40045564
+UI_SET_KEYBIT = 0x40045565
+UI_SET_ABSBIT = 0x40045567
+
+BUS_USB = 0x03
+
+# struct input_event { struct timeval time; __u16 type; __u16 code; __s32 value; }
+_EVENT = struct.Struct("llHHi")
+
+# XUSB bit -> key code, as the xpad driver reports an X360 pad
+_KEYS = {
+    XUSB_A: BTN_A,
+    XUSB_B: BTN_B,
+    XUSB_X: BTN_X,
+    XUSB_Y: BTN_Y,
+    XUSB_LEFT_SHOULDER: BTN_TL,
+    XUSB_RIGHT_SHOULDER: BTN_TR,
+    XUSB_BACK: BTN_SELECT,
+    XUSB_START: BTN_START,
+    XUSB_LEFT_THUMB: BTN_THUMBL,
+    XUSB_RIGHT_THUMB: BTN_THUMBR,
+}
+
+# code -> (min, max, fuzz, flat), matching xpad
+_AXES = {
+    ABS_X: (-32768, 32767, 16, 128),
+    ABS_Y: (-32768, 32767, 16, 128),
+    ABS_RX: (-32768, 32767, 16, 128),
+    ABS_RY: (-32768, 32767, 16, 128),
+    ABS_Z: (0, 255, 0, 0),
+    ABS_RZ: (0, 255, 0, 0),
+    ABS_HAT0X: (-1, 1, 0, 0),
+    ABS_HAT0Y: (-1, 1, 0, 0),
+}
+
+
+def _flip(value: int) -> int:
+    """
+    XInput Y axes point up, evdev Y axes point down.
+    """
+    return max(-32768, min(32767, -value))
+
+
+class UInputBackend(PadBackend):
+    """
+    X360-compatible evdev pad created through /dev/uinput (Linux).
+
+    Setters only stage state. update() compares it with what was last
+    written and emits every changed key/axis as input_events followed by
+    one SYN_REPORT, in a single write().
+
+    Pass `fd` (an open file descriptor) to write events there instead:
+    open() then skips all uinput ioctls, so a pipe or regular file stands
+    in for the device when /dev/uinput is unavailable (tests, CI).
+    """
+
+    name = "uinput"
+
+    def __init__(
+        self,
+        path: str = "/dev/uinput",
+        fd: Optional[int] = None,
+        device_name: str = "Microsoft X-Box 360 pad",
+        vendor: int = 0x045E,
+        product: int = 0x028E,
+    ):
+        self.path = path
+        self.device_name = device_name
+        self.vendor = vendor
+        self.product = product
+        self._fd = fd
+        self._owns_fd = fd is None
+        self._created = False
+
+        self.writes = 0
+        self.reset()
+        self._sent = {}
+
+    # -------------------------------------------------------------------------
+    # Device lifecycle
+    # -------------------------------------------------------------------------
+
+    def open(self) -> None:
+        if self._created:
+            return
+        if not self._owns_fd:
+            self._created = True
+            return
+
+        import fcntl
+
+        fd = os.open(self.path, os.O_WRONLY | os.O_NONBLOCK)
+        try:
+            fcntl.ioctl(fd, UI_SET_EVBIT, EV_KEY)
+            for code in _KEYS.values():
+                fcntl.ioctl(fd, UI_SET_KEYBIT, code)
+            fcntl.ioctl(fd, UI_SET_EVBIT, EV_ABS)
+            for code in _AXES:
+                fcntl.ioctl(fd, UI_SET_ABSBIT, code)
+
+            os.write(fd, self._user_dev())
+            fcntl.ioctl(fd, UI_DEV_CREATE)
+        except Exception:
+            os.close(fd)
+            raise
+
+        self._fd = fd
+        self._created = True
+
+    def close(self) -> None:
+        if not self._created:
+            return
+        self._created = False
+        self._sent = {}
+        if self._owns_fd and self._fd is not None:
+            try:
+                import fcntl
+                fcntl.ioctl(self._fd, UI_DEV_DESTROY)
+            finally:
+                os.close(self._fd)
+                self._fd = None
+
+    def _user_dev(self) -> bytes:
+        """
+        struct uinput_user_dev: name, input_id, ff_effects_max and the
+        absmax/absmin/absfuzz/absflat arrays.
+        """
+        absmax = [0] * ABS_CNT
+        absmin = [0] * ABS_CNT
+        absfuzz = [0] * ABS_CNT
+        absflat = [0] * ABS_CNT
+        for code, (lo, hi, fuzz, flat) in _AXES.items():
+            absmin[code], absmax[code], absfuzz[code], absflat[code] = lo, hi, fuzz, flat
+
+        return struct.pack(
+            f"80sHHHHI{ABS_CNT}i{ABS_CNT}i{ABS_CNT}i{ABS_CNT}i",
+            self.device_name.encode()[:79],
+            BUS_USB, self.vendor, self.product, 0x0110,
+            0,
+            *absmax, *absmin, *absfuzz, *absflat,
+        )
+
+    # -------------------------------------------------------------------------
+    # Staged state
+    # -------------------------------------------------------------------------
+
+    def press_button(self, button: int) -> None:
+        self.buttons |= button
+
+    def release_button(self, button: int) -> None:
+        self.buttons &= ~button
+
+    def left_trigger(self, value: int) -> None:
+        self.lt = value
+
+    def right_trigger(self, value: int) -> None:
+        self.rt = value
+
+    def left_joystick(self, x_value: int, y_value: int) -> None:
+        self.lx, self.ly = x_value, y_value
+
+    def right_joystick(self, x_value: int, y_value: int) -> None:
+        self.rx, self.ry = x_value, y_value
+
+    def reset(self) -> None:
+        self.buttons = 0
+        self.lt = self.rt = 0
+        self.lx = self.ly = self.rx = self.ry = 0
+
+    # -------------------------------------------------------------------------
+    # Submit
+    # -------------------------------------------------------------------------
+
+    def _state(self) -> dict:
+        buttons = self.buttons
+        state = {(EV_KEY, code): 1 if buttons & bit else 0 for bit, code in _KEYS.items()}
+        state[(EV_ABS, ABS_X)] = self.lx
+        state[(EV_ABS, ABS_Y)] = _flip(self.ly)
+        state[(EV_ABS, ABS_RX)] = self.rx
+        state[(EV_ABS, ABS_RY)] = _flip(self.ry)
+        state[(EV_ABS, ABS_Z)] = self.lt
+        state[(EV_ABS, ABS_RZ)] = self.rt
+        state[(EV_ABS, ABS_HAT0X)] = (
+            (1 if buttons & XUSB_DPAD_RIGHT else 0) - (1 if buttons & XUSB_DPAD_LEFT else 0)
+        )
+        state[(EV_ABS, ABS_HAT0Y)] = (
+            (1 if buttons & XUSB_DPAD_DOWN else 0) - (1 if buttons & XUSB_DPAD_UP else 0)
+        )
+        return state
+
+    def pending_events(self) -> List[tuple]:
+        """
+        Return the (type, code, value) events update() would write now,
+        excluding the trailing SYN_REPORT.
+        """
+        sent = self._sent
+        return [
+            (ev_type, code, value)
+            for (ev_type, code), value in self._state().items()
+            if sent.get((ev_type, code)) != value
+        ]
+
+    def update(self) -> None:
+        events = self.pending_events()
+        if not events:
+            return
+
+        pack = _EVENT.pack
+        payload = b"".join([pack(0, 0, ev_type, code, value) for ev_type, code, value in events])
+        payload += pack(0, 0, EV_SYN, SYN_REPORT, 0)
+
+        written = os.write(self._fd, payload)
+        if written != len(payload):
+            # uinput accepts whole events only; a short write means the
+            # device is gone or the fd is broken
+            raise OSError(f"Short write to uinput: {written}/{len(payload)} bytes")
+
+        self.writes += 1
+        for ev_type, code, value in events:
+            self._sent[(ev_type, code)] = value
@@ -14,3 +14,23 @@ class controllerMonitor:
         binary = "".join("1" if bool(btn) else "0" for btn in buttons)
 
         return binary, rt, lt, jlx, jly, jrx, jry
+
+    @classmethod
+    def button_mask(cls, a, b, y, x, start, option, r3, l3, dpu, dpd, dpr, dpl, rb, lb) -> int:
+        # Same order as `monitor`, packed as an int (bit 0 = a, bit 13 = lb)
+        return (
+            (1 if a else 0)
+            | (2 if b else 0)
+            | (4 if y else 0)
+            | (8 if x else 0)
+            | (16 if start else 0)
+            | (32 if option else 0)
+            | (64 if r3 else 0)
+            | (128 if l3 else 0)
+            | (256 if dpu else 0)
+            | (512 if dpd else 0)
+            | (1024 if dpr else 0)
+            | (2048 if dpl else 0)
+            | (4096 if rb else 0)
+            | (8192 if lb else 0)
+        )
@@ -1,7 +1,7 @@
+import queue
 import subprocess
-from typing import Iterable, Dict, Optional, Tuple
-
-import keyboard
+import threading
+from typing import Callable, Iterable, Dict, Optional, Tuple
 
 
 class HotkeyCommander:
@@ -40,12 +40,23 @@ class HotkeyCommander:
         custom_commands: Optional[Dict[str, str]] = None,
         default_working_dir: Optional[str] = None,
     ):
-        self.media_controls = keyboard
+        self._media_controls = None
         self.media_functions = media_functions
         self.custom_commands = custom_commands or {}
         self.default_working_dir = default_working_dir
 
-    def do(self, function: str, is_custom_command: bool) -> Tuple[bool, str]:
+    @property
+    def media_controls(self):
+        """
+        The `keyboard` module, imported on first use: importing it hooks
+        the OS keyboard, which startup should not pay for.
+        """
+        if self._media_controls is None:
+            import keyboard
+            self._media_controls = keyboard
+        return self._media_controls
+
+    def do(self, function: str, is_custom_command: bool, timeout: Optional[float] = None) -> Tuple[bool, str]:
         """
         Execute the given function.
 
@@ -54,7 +65,8 @@ class HotkeyCommander:
 
         If is_custom_command is True:
             - Treat `function` as a key in `self.custom_commands` and
-              execute the mapped shell command via `subprocess.run`.
+              execute the mapped shell command via `subprocess.run`,
+              killing it after `timeout` seconds if given.
 
         Returns:
             (ok, message)
@@ -86,6 +98,7 @@ class HotkeyCommander:
                     cwd=self.default_working_dir,
                     capture_output=True,
                     text=True,
+                    timeout=timeout,
                 )
 
                 if completed.returncode == 0:
@@ -96,8 +109,148 @@ class HotkeyCommander:
                         f"Command '{function}' failed with code {completed.returncode}.\n"
                         f"stdout:\n{completed.stdout}\n\nstderr:\n{completed.stderr}",
                     )
+            except subprocess.TimeoutExpired:
+                return False, f"Custom command '{function}' timed out after {timeout}s."
             except Exception as e:
                 return False, f"Failed to execute custom command '{function}': {e}"
 
         # Should never get here
         return False, "Invalid usage of HotkeyCommander.do(...)"
+
+
+ResultCallback = Callable[[str, bool, str], None]
+
+
+class HotkeyExecutor:
+    """
+    Runs HotkeyCommander actions on a small pool of background threads so the
+    controller input path only enqueues and returns.
+
+    - At most `max_queue` actions wait at once; further submits are dropped.
+    - Each action name may have at most `limits.get(name, default_limit)`
+      executions queued or running; submits beyond that are dropped
+      (a held hotkey auto-repeating faster than its action completes
+      should not build a backlog).
+    - Custom commands are killed after `timeout` seconds.
+    - `on_result(function, ok, message)` and the per-submit callback are
+      called on the worker thread when an action finishes.
+
+    Usage:
+        executor = HotkeyExecutor(commander)
+        executor.submit("volume up", is_custom_command=False)
+    """
+
+    def __init__(
+        self,
+        commander: HotkeyCommander,
+        max_workers: int = 2,
+        max_queue: int = 16,
+        timeout: Optional[float] = 10.0,
+        default_limit: int = 1,
+        limits: Optional[Dict[str, int]] = None,
+        on_result: Optional[ResultCallback] = None,
+    ):
+        self.commander = commander
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.default_limit = default_limit
+        self.limits = limits or {}
+        self.on_result = on_result
+
+        self.dropped = 0
+        self.completed = 0
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, int] = {}
+        self._workers = []
+        self._closed = False
+
+    def submit(
+        self,
+        function: str,
+        is_custom_command: bool,
+        callback: Optional[ResultCallback] = None,
+    ) -> bool:
+        """
+        Queue an action without waiting for it.
+
+        Returns:
+            True if queued, False if dropped (busy, queue full or shut down).
+        """
+        with self._lock:
+            if self._closed:
+                return False
+
+            limit = self.limits.get(function, self.default_limit)
+            if self._in_flight.get(function, 0) >= limit:
+                self.dropped += 1
+                return False
+
+            try:
+                self._queue.put_nowait((function, is_custom_command, callback))
+            except queue.Full:
+                self.dropped += 1
+                return False
+
+            self._in_flight[function] = self._in_flight.get(function, 0) + 1
+
+            # workers are started lazily, one per submit up to max_workers
+            if len(self._workers) < self.max_workers:
+                t = threading.Thread(target=self._worker_loop, name="HotkeyExecutor", daemon=True)
+                self._workers.append(t)
+                t.start()
+
+        return True
+
+    def shutdown(self, wait: bool = False) -> None:
+        """
+        Stop accepting actions. Queued actions are dropped; running ones
+        finish (custom commands within `timeout`). Does not block unless
+        `wait` is set.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            workers = list(self._workers)
+
+        # wake idle workers; busy ones see _closed on their next get(), and
+        # a full queue means none is idle
+        for _ in workers:
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                break
+
+        if wait:
+            for t in workers:
+                t.join()
+
+    def _worker_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None or self._closed:
+                return
+
+            function, is_custom_command, callback = item
+            try:
+                ok, msg = self.commander.do(function, is_custom_command, timeout=self.timeout)
+            except Exception as e:
+                ok, msg = False, f"Hotkey action '{function}' raised: {e}"
+            finally:
+                with self._lock:
+                    remaining = self._in_flight.get(function, 1) - 1
+                    if remaining > 0:
+                        self._in_flight[function] = remaining
+                    else:
+                        self._in_flight.pop(function, None)
+                    self.completed += 1
+
+            for cb in (callback, self.on_result):
+                if cb is None:
+                    continue
+                try:
+                    cb(function, ok, msg)
+                except Exception as e:
+                    print(f"[HotkeyExecutor] Result callback failed: {e}")
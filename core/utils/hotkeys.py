@@ -2,10 +2,12 @@ from __future__ import annotations
 
 import json
 import os
+import time
 from typing import Iterable, Union, Dict, List, Tuple, Any
 
 
 BinaryLike = Union[
+    int,
     bytes,
     bytearray,
     str,
@@ -30,15 +32,23 @@ class Hotkey:
 
     Each binary pattern represents the pressed state of the controller buttons
     defined in `buttons_layout`.
+
+    In memory the patterns are also indexed as integer bitmasks, where bit `i`
+    is set when `buttons_layout[i]` is pressed (i.e. the first character of
+    the pattern is the least significant bit). Passing such an int to
+    `get_hotkey` skips all string normalization.
     """
 
-    def __init__(self, keys_file_name: str):
+    def __init__(self, keys_file_name: str, reload_interval: float = 1.0):
         """
         Initialize the hotkey manager and load existing mappings.
 
         :param keys_file_name: Path to the JSON file used for persistence.
+        :param reload_interval: Minimum seconds between checks of the JSON
+            file for external changes. Lookups in between never touch disk.
         """
         self.keys_file_name = keys_file_name
+        self.reload_interval = reload_interval
 
         # Controller button order (must match UI / controller monitor mapping)
         self.buttons_layout = [
@@ -62,6 +72,13 @@ class Hotkey:
         # { "<binary_pattern>": "<function_name>" }
         self.keys: Dict[str, str] = {}
 
+        # { <button_bitmask>: "<function_name>" }, derived from self.keys
+        self._mask_index: Dict[int, str] = {}
+
+        # (st_mtime_ns, st_ino, st_size) of the file when last loaded/saved
+        self._file_signature: Tuple[int, int, int] | None = None
+        self._next_check = 0.0
+
         self.update_hotkeys()
 
     # ------------------------------------------------------------------
@@ -100,10 +117,17 @@ class Hotkey:
         """
         Resolve a binary button pattern to its assigned function.
 
-        :param binary_input: Button state representation.
+        :param binary_input: Button state representation, or an int bitmask
+            as produced by `controllerMonitor.button_mask`.
         :return: (success, function_name, message)
         """
-        self.update_hotkeys()
+        self.reload_if_changed()
+
+        if isinstance(binary_input, int):
+            function = self._mask_index.get(binary_input)
+            if not function:
+                return False, "", "No hotkey assigned for this button state."
+            return True, function, f"{self.mask_to_pattern(binary_input)} => {function}"
 
         normalized = self._normalize_binary_input(binary_input)
 
@@ -132,7 +156,7 @@ class Hotkey:
         :param binary_input: Button pattern to remove.
         :return: (success, message)
         """
-        self.update_hotkeys()
+        self.reload_if_changed(force=True)
 
         normalized = self._normalize_binary_input(binary_input)
 
@@ -164,7 +188,7 @@ class Hotkey:
             }
         }
         """
-        self.update_hotkeys()
+        self.reload_if_changed(force=True)
 
         result: Dict[str, Dict[str, Any]] = {}
 
@@ -190,6 +214,24 @@ class Hotkey:
     # Binary Translation / Validation
     # ------------------------------------------------------------------
 
+    def pattern_to_mask(self, pattern: str) -> int:
+        """
+        Convert a "0101..." pattern to its integer bitmask.
+
+        :param pattern: Binary string in `buttons_layout` order.
+        :return: Bitmask with bit `i` set for each pressed button `i`.
+        """
+        return int(pattern[::-1], 2) if pattern else 0
+
+    def mask_to_pattern(self, mask: int) -> str:
+        """
+        Convert an integer bitmask back to the "0101..." pattern form.
+
+        :param mask: Button bitmask.
+        :return: Binary string in `buttons_layout` order.
+        """
+        return format(mask, f"0{len(self.buttons_layout)}b")[::-1]
+
     def _translate_binary_to_key(self, normalized_bits: List[bool]) -> List[str]:
         """
         Convert a binary button state to human-readable button names.
@@ -248,6 +290,27 @@ class Hotkey:
     # Persistence
     # ------------------------------------------------------------------
 
+    def reload_if_changed(self, force: bool = False) -> bool:
+        """
+        Reload hotkeys only if the JSON file changed on disk.
+
+        The file is stat()ed at most once per `reload_interval` seconds, so
+        calling this on every controller report is cheap.
+
+        :param force: Check the file now, ignoring the interval.
+        :return: True if the in-memory table was reloaded.
+        """
+        now = time.monotonic()
+        if not force and now < self._next_check:
+            return False
+        self._next_check = now + self.reload_interval
+
+        if self._stat_signature() == self._file_signature:
+            return False
+
+        self.update_hotkeys()
+        return True
+
     def update_hotkeys(self) -> None:
         """
         Load hotkeys from the JSON file.
@@ -268,15 +331,48 @@ class Hotkey:
             else:
                 self.keys = {str(k): str(v) for k, v in data.items()}
 
+            self._rebuild_mask_index()
+            self._file_signature = self._stat_signature()
+
         except (json.JSONDecodeError, OSError):
             self.keys = {}
             self._save_hotkeys()
 
+    def _rebuild_mask_index(self) -> None:
+        """
+        Rebuild the bitmask -> function index from the string patterns.
+
+        Patterns that are malformed or of the wrong length are skipped.
+        """
+        index: Dict[int, str] = {}
+
+        for pattern, function in self.keys.items():
+            s = pattern.strip().replace(" ", "")
+            if len(s) != len(self.buttons_layout) or any(ch not in "01" for ch in s):
+                continue
+            index[self.pattern_to_mask(s)] = function
+
+        self._mask_index = index
+
+    def _stat_signature(self) -> Tuple[int, int, int] | None:
+        """
+        Return a cheap fingerprint of the JSON file, or None if it is missing.
+        """
+        try:
+            st = os.stat(self.keys_file_name)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_ino, st.st_size
+
     def _save_hotkeys(self) -> None:
         """
         Persist hotkey mappings to the JSON file.
         """
+        self._rebuild_mask_index()
+
         os.makedirs(os.path.dirname(self.keys_file_name) or ".", exist_ok=True)
 
         with open(self.keys_file_name, "w", encoding="utf-8") as f:
             json.dump(self.keys, f, indent=2, ensure_ascii=False)
+
+        self._file_signature = self._stat_signature()
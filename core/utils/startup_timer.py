@@ -0,0 +1,51 @@
+"""
+Startup timing marks for the GUI.
+
+main.py imports this module before anything else, so times are measured
+from (almost) process start. mark() is cheap and always on; the report is
+printed only when asked for (python main.py --startup-timing).
+"""
+
+import time
+from typing import List, Tuple
+
+_start = time.perf_counter()
+_marks: List[Tuple[str, float]] = []
+
+enabled = False
+
+
+def mark(label: str) -> float:
+    """
+    Record that `label` happened now. Returns milliseconds since start.
+    """
+    now = time.perf_counter()
+    _marks.append((label, now))
+    return (now - _start) * 1000.0
+
+
+def timed(label: str, func, *args, **kwargs):
+    """
+    Call func(*args, **kwargs) and mark it as `label`, printing the
+    duration when enabled (for work done after the startup report).
+    """
+    t0 = time.perf_counter()
+    result = func(*args, **kwargs)
+    mark(label)
+    if enabled:
+        print(f"[startup] {label}: {(time.perf_counter() - t0) * 1000.0:.1f} ms")
+    return result
+
+
+def report() -> str:
+    lines = [f"{'ms':>9} {'+ms':>9}  stage"]
+    prev = _start
+    for label, at in _marks:
+        lines.append(f"{(at - _start) * 1000.0:9.1f} {(at - prev) * 1000.0:9.1f}  {label}")
+        prev = at
+    return "Startup timing\n" + "\n".join(lines)
+
+
+def print_report() -> None:
+    if enabled:
+        print(report(), flush=True)
@@ -0,0 +1,243 @@
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Callable, Dict, Optional, Tuple
+
+
+# XUSB wButtons bits (same values as vg.XUSB_BUTTON)
+XUSB_DPAD_UP = 0x0001
+XUSB_DPAD_DOWN = 0x0002
+XUSB_DPAD_LEFT = 0x0004
+XUSB_DPAD_RIGHT = 0x0008
+XUSB_START = 0x0010
+XUSB_BACK = 0x0020
+XUSB_LEFT_THUMB = 0x0040
+XUSB_RIGHT_THUMB = 0x0080
+XUSB_LEFT_SHOULDER = 0x0100
+XUSB_RIGHT_SHOULDER = 0x0200
+XUSB_A = 0x1000
+XUSB_B = 0x2000
+XUSB_X = 0x4000
+XUSB_Y = 0x8000
+
+XUSB_ALL_BUTTONS = (
+    XUSB_DPAD_UP, XUSB_DPAD_DOWN, XUSB_DPAD_LEFT, XUSB_DPAD_RIGHT,
+    XUSB_START, XUSB_BACK, XUSB_LEFT_THUMB, XUSB_RIGHT_THUMB,
+    XUSB_LEFT_SHOULDER, XUSB_RIGHT_SHOULDER,
+    XUSB_A, XUSB_B, XUSB_X, XUSB_Y,
+)
+XUSB_ALL_MASK = sum(XUSB_ALL_BUTTONS)
+
+
+class PadBackend(ABC):
+    """
+    A virtual X360 pad that EmulateX360 drives.
+
+    The interface mirrors vg.VX360Gamepad, except that buttons are plain
+    XUSB bit values. Setters stage state; update() submits it.
+
+    open() is called (possibly several times, until it succeeds) before
+    any other method and may raise if the pad cannot be created yet.
+    """
+
+    name = "base"
+
+    def open(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    @abstractmethod
+    def press_button(self, button: int) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def release_button(self, button: int) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def left_trigger(self, value: int) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def right_trigger(self, value: int) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def left_joystick(self, x_value: int, y_value: int) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def right_joystick(self, x_value: int, y_value: int) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def reset(self) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def update(self) -> None:
+        raise NotImplementedError
+
+
+class NullBackend(PadBackend):
+    """
+    Accepts everything and does nothing.
+    """
+
+    name = "null"
+
+    def press_button(self, button: int) -> None:
+        pass
+
+    def release_button(self, button: int) -> None:
+        pass
+
+    def left_trigger(self, value: int) -> None:
+        pass
+
+    def right_trigger(self, value: int) -> None:
+        pass
+
+    def left_joystick(self, x_value: int, y_value: int) -> None:
+        pass
+
+    def right_joystick(self, x_value: int, y_value: int) -> None:
+        pass
+
+    def reset(self) -> None:
+        pass
+
+    def update(self) -> None:
+        pass
+
+
+# (buttons, left_trigger, right_trigger, lx, ly, rx, ry)
+PadFrame = Tuple[int, int, int, int, int, int, int]
+
+
+class RecordingBackend(PadBackend):
+    """
+    Keeps the staged pad state in memory and records a PadFrame on every
+    update(), keeping the newest `max_frames`.
+    """
+
+    name = "recording"
+
+    def __init__(self, max_frames: int = 10000):
+        self.frames = deque(maxlen=max_frames)
+        self.updates = 0
+        self.reset()
+
+    def press_button(self, button: int) -> None:
+        self.buttons |= button
+
+    def release_button(self, button: int) -> None:
+        self.buttons &= ~button
+
+    def left_trigger(self, value: int) -> None:
+        self.lt = value
+
+    def right_trigger(self, value: int) -> None:
+        self.rt = value
+
+    def left_joystick(self, x_value: int, y_value: int) -> None:
+        self.lx, self.ly = x_value, y_value
+
+    def right_joystick(self, x_value: int, y_value: int) -> None:
+        self.rx, self.ry = x_value, y_value
+
+    def reset(self) -> None:
+        self.buttons = 0
+        self.lt = self.rt = 0
+        self.lx = self.ly = self.rx = self.ry = 0
+
+    def update(self) -> None:
+        self.updates += 1
+        self.frames.append((self.buttons, self.lt, self.rt, self.lx, self.ly, self.rx, self.ry))
+
+    @property
+    def state(self) -> PadFrame:
+        return (self.buttons, self.lt, self.rt, self.lx, self.ly, self.rx, self.ry)
+
+
+class VgamepadBackend(PadBackend):
+    """
+    ViGEmBus pad through vgamepad (Windows).
+
+    vgamepad is imported on first open(), so importing this module never
+    requires it. open() raises while ViGEmBus is unavailable.
+    """
+
+    name = "vgamepad"
+
+    def __init__(self):
+        self._pad = None
+        self._buttons = {}
+
+    def open(self) -> None:
+        if self._pad is not None:
+            return
+        import vgamepad as vg
+
+        self._buttons = {bit: vg.XUSB_BUTTON(bit) for bit in XUSB_ALL_BUTTONS}
+        self._pad = vg.VX360Gamepad()
+
+    def close(self) -> None:
+        self._pad = None
+
+    def press_button(self, button: int) -> None:
+        self._pad.press_button(button=self._buttons[button])
+
+    def release_button(self, button: int) -> None:
+        self._pad.release_button(button=self._buttons[button])
+
+    def left_trigger(self, value: int) -> None:
+        self._pad.left_trigger(value=value)
+
+    def right_trigger(self, value: int) -> None:
+        self._pad.right_trigger(value=value)
+
+    def left_joystick(self, x_value: int, y_value: int) -> None:
+        self._pad.left_joystick(x_value=x_value, y_value=y_value)
+
+    def right_joystick(self, x_value: int, y_value: int) -> None:
+        self._pad.right_joystick(x_value=x_value, y_value=y_value)
+
+    def reset(self) -> None:
+        self._pad.reset()
+
+    def update(self) -> None:
+        self._pad.update()
+
+
+def _uinput_backend() -> PadBackend:
+    # imported lazily: core.uinput_pad builds on this module
+    from core.uinput_pad import UInputBackend
+    return UInputBackend()
+
+
+BACKENDS: Dict[str, Callable[[], PadBackend]] = {
+    VgamepadBackend.name: VgamepadBackend,
+    "uinput": _uinput_backend,
+    RecordingBackend.name: RecordingBackend,
+    NullBackend.name: NullBackend,
+}
+
+DEFAULT_BACKEND = VgamepadBackend.name
+
+
+def create_backend(backend: Optional[object] = None) -> PadBackend:
+    """
+    Return a PadBackend from a backend name, an instance, or None (default).
+
+    :raises ValueError: If the name is not registered in BACKENDS.
+    """
+    if backend is None:
+        backend = DEFAULT_BACKEND
+    if isinstance(backend, str):
+        try:
+            return BACKENDS[backend]()
+        except KeyError:
+            raise ValueError(f"Unknown virtual pad backend: {backend}") from None
+    return backend
@@ -1,12 +1,37 @@
 import sys
-from PySide6.QtWidgets import QApplication
-from ui.main_window import MainWindow
+from core.utils import startup_timer
+from core import latency
 
 def main():
+    if "--headless" in sys.argv[1:]:
+        # no Qt at all: see core/daemon.py
+        from core.daemon import main as headless_main
+        sys.exit(headless_main([arg for arg in sys.argv[1:] if arg != "--headless"]))
+
+    if "--startup-timing" in sys.argv[1:]:
+        sys.argv.remove("--startup-timing")
+        startup_timer.enabled = True
+
+    from PySide6.QtCore import QTimer
+    from PySide6.QtWidgets import QApplication
+    from ui.main_window import MainWindow
+    startup_timer.mark("imports")
+
     app = QApplication(sys.argv)
     app.setApplicationName("Universal Remapper")
+    startup_timer.mark("QApplication")
     window = MainWindow(app)
+    startup_timer.mark("MainWindow")
     window.show()
+    startup_timer.mark("show()")
+    # kill -USR1 <pid> prints input latency percentiles
+    latency.install_dump_signal()
+
+    def _first_iteration():
+        startup_timer.mark("first event loop iteration (window up)")
+        startup_timer.print_report()
+
+    QTimer.singleShot(0, _first_iteration)
 
     sys.exit(app.exec())
 
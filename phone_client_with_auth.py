@@ -3,7 +3,9 @@ import os
 import uuid
 import json
 import socket
+import struct
 import threading
+import time
 from math import sqrt, atan2, cos, sin
 
 from kivy.app import App
@@ -31,6 +33,26 @@ UUID_FILE = "gamepad_uuid.txt"
 LAST_IP_FILE = "last_ip.txt"
 NAME_FILE = "device_name.txt"
 
+# Binary input frames, sent instead of JSON once the server accepts them.
+# Same layout as core/input_frame.py on the server; keep them in sync.
+SUPPORTED_FRAME_VERSIONS = (1,)
+FRAME_V1_MAGIC = 0xB1
+FRAME_V1 = struct.Struct("<BHIH6B")  # magic, seq, time_ms, buttons, lx, ly, rx, ry, l2, r2
+USE_UDP = True  # send frames over UDP when the server offers it
+
+# State is sent when it changes, not on a timer. Stick/trigger moves within
+# SEND_COALESCE of the previous send are merged into one message; button
+# presses always go out at once. An unchanged state is resent every
+# KEEPALIVE_INTERVAL so a lost datagram cannot leave a button held.
+SEND_COALESCE = 0.008
+KEEPALIVE_INTERVAL = 0.5
+FRAME_BUTTONS = (
+    "A", "B", "X", "Y",
+    "LB", "RB", "BACK", "START", "GUIDE",
+    "L3", "R3",
+    "DPAD_UP", "DPAD_DOWN", "DPAD_LEFT", "DPAD_RIGHT",
+)
+
 Window.clearcolor = (0.07, 0.09, 0.12, 1)
 
 
@@ -335,7 +357,16 @@ class XboxClient(BoxLayout):
         self._rx_stop = threading.Event()
         self._rx_thread = None
         self._gyro_poll_ev = None
-        self._periodic_send_ev = None
+        self._keepalive_ev = None
+        self._flush_ev = None
+        self._last_sent_key = None
+        self._last_send = 0.0
+
+        # binary frame version agreed with the server (0 = JSON)
+        self._frame_version = 0
+        self._frame_seq = 0
+        # UDP input channel: (socket, token) once the server offers one
+        self._udp = None
 
         self.buttons = {
             "A": 0, "B": 0, "X": 0, "Y": 0,
@@ -353,7 +384,7 @@ class XboxClient(BoxLayout):
         self._gyro_last_sample = None
 
         self._build_ui()
-        self._periodic_send_ev = Clock.schedule_interval(self.periodic_send, 0.10)
+        self._keepalive_ev = Clock.schedule_interval(self._keepalive, KEEPALIVE_INTERVAL / 4)
         self._gyro_poll_ev = Clock.schedule_interval(self._poll_gyro, 0.05)
         self._apply_mode_ui()
 
@@ -741,7 +772,7 @@ class XboxClient(BoxLayout):
             return
         self.mode = mode
         self._apply_mode_ui()
-        self.send_state()
+        self.send_state(urgent=True)
 
     def toggle_gyro(self, *_):
         if not self._gyro_supported:
@@ -751,7 +782,7 @@ class XboxClient(BoxLayout):
         if self.gyro_enabled and self._gyro_neutral is None:
             self.calibrate_gyro()
         self._update_gyro_ui()
-        self.send_state()
+        self.send_state(urgent=True)
 
     def calibrate_gyro(self, *_):
         if not self._gyro_supported:
@@ -769,7 +800,7 @@ class XboxClient(BoxLayout):
 
     def _momentary_button(self, key, value):
         self.buttons[key] = value
-        self.send_state()
+        self.send_state(urgent=True)
 
     def _on_trigger_change(self, which, value):
         self.analog[which] = int(round(value))
@@ -826,6 +857,9 @@ class XboxClient(BoxLayout):
 
             self.sock = s
             self.connected = True
+            self._frame_version = 0
+            self._close_udp()
+            self._last_sent_key = None
             self._rx_stop.clear()
 
             Clock.schedule_once(lambda dt: self._on_connected_ui(True), 0)
@@ -833,7 +867,7 @@ class XboxClient(BoxLayout):
             self._rx_thread = threading.Thread(target=self._rx_loop, daemon=True)
             self._rx_thread.start()
 
-            self.send_state()
+            Clock.schedule_once(lambda dt: self.send_state(urgent=True), 0)
 
         except Exception:
             try:
@@ -873,6 +907,7 @@ class XboxClient(BoxLayout):
                 pass
 
     def _rx_loop(self):
+        buffer = b""
         try:
             while not self._rx_stop.is_set() and self.sock:
                 try:
@@ -883,9 +918,42 @@ class XboxClient(BoxLayout):
                     continue
                 except Exception:
                     break
+
+                buffer += data
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    self._handle_server_message(line)
         finally:
             Clock.schedule_once(lambda dt: self.disconnect(), 0)
 
+    def _handle_server_message(self, line):
+        try:
+            msg = json.loads(line)
+        except ValueError:
+            return
+        if isinstance(msg, dict) and msg.get("type") == "auth_ok":
+            version = msg.get("frame_version", 0)
+            self._frame_version = version if version in SUPPORTED_FRAME_VERSIONS else 0
+            if USE_UDP and self._frame_version and msg.get("udp_port") and msg.get("udp_token"):
+                self._open_udp(int(msg["udp_port"]), bytes.fromhex(msg["udp_token"]))
+
+    def _open_udp(self, port, token):
+        self._close_udp()
+        try:
+            u = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            u.connect((self.sock.getpeername()[0], port))
+            self._udp = (u, token)
+        except Exception:
+            self._udp = None
+
+    def _close_udp(self):
+        udp, self._udp = self._udp, None
+        if udp:
+            try:
+                udp[0].close()
+            except Exception:
+                pass
+
     def on_submit_code(self, *_):
         code = (self.code_input.text or "").strip()
         if not code:
@@ -910,6 +978,7 @@ class XboxClient(BoxLayout):
     def disconnect(self):
         self._rx_stop.set()
         self.connected = False
+        self._close_udp()
         try:
             if self.sock:
                 self.sock.close()
@@ -922,12 +991,45 @@ class XboxClient(BoxLayout):
         if not self.connected or not self.sock:
             return
         try:
-            data = (json.dumps(obj) + "\n").encode("utf-8")
+            if self._frame_version and "buttons" in obj and "auth_code" not in obj:
+                data = self._pack_frame(obj)
+                udp = self._udp
+                if udp:
+                    try:
+                        udp[0].send(udp[1] + data)
+                        return
+                    except OSError:
+                        # fall back to TCP
+                        self._close_udp()
+            else:
+                data = (json.dumps(obj) + "\n").encode("utf-8")
             with self._send_lock:
                 self.sock.sendall(data)
         except Exception:
             self.disconnect()
 
+    def _pack_frame(self, obj):
+        buttons = obj["buttons"]
+        mask = 0
+        for i, name in enumerate(FRAME_BUTTONS):
+            if buttons.get(name):
+                mask |= 1 << i
+        stick = obj["joystick"]
+        analog = obj["analog"]
+        self._frame_seq = (self._frame_seq + 1) & 0xFFFF
+        return FRAME_V1.pack(
+            FRAME_V1_MAGIC,
+            self._frame_seq,
+            int(time.monotonic() * 1000) & 0xFFFFFFFF,
+            mask,
+            clamp(int(stick["left_x"]), 0, 255),
+            clamp(int(stick["left_y"]), 0, 255),
+            clamp(int(stick["right_x"]), 0, 255),
+            clamp(int(stick["right_y"]), 0, 255),
+            clamp(int(analog["L2"]), 0, 255),
+            clamp(int(analog["R2"]), 0, 255),
+        )
+
     # -------------------- State --------------------
     def build_state_message(self):
         return {
@@ -942,14 +1044,54 @@ class XboxClient(BoxLayout):
                 "neutral_x": self._gyro_neutral,
                 "steer": round(self._gyro_steer, 4),
             },
+            "frames": list(SUPPORTED_FRAME_VERSIONS),
         }
 
-    def send_state(self):
+    def _state_key(self):
+        return (
+            self.mode,
+            self.gyro_enabled,
+            tuple(self.buttons.values()),
+            tuple(self.analog.values()),
+            tuple(self.joystick.values()),
+        )
+
+    def send_state(self, urgent=False):
+        """
+        Send the state if it changed since the last send. Non-urgent
+        changes (sticks, triggers, tilt) close to the previous send are
+        merged and flushed once SEND_COALESCE has passed.
+        """
+        if not self.connected:
+            return
+        if urgent:
+            self._flush_state()
+            return
+        if self._flush_ev is not None:
+            return  # already scheduled, it will pick this change up
+
+        wait = self._last_send + SEND_COALESCE - time.monotonic()
+        if wait <= 0:
+            self._flush_state()
+        else:
+            self._flush_ev = Clock.schedule_once(self._flush_state, wait)
+
+    def _flush_state(self, *_):
+        if self._flush_ev is not None:
+            self._flush_ev.cancel()
+            self._flush_ev = None
+        key = self._state_key()
+        if key != self._last_sent_key:
+            self._send_state_now(key)
+
+    def _send_state_now(self, key):
+        self._last_sent_key = key
+        self._last_send = time.monotonic()
         self._send(self.build_state_message())
 
-    def periodic_send(self, dt):
-        if self.connected:
-            self.send_state()
+    def _keepalive(self, dt):
+        if self.connected and time.monotonic() - self._last_send >= KEEPALIVE_INTERVAL:
+            self._send_state_now(self._state_key())
 
     # -------------------- Gyro --------------------
     def _poll_gyro(self, dt):
@@ -0,0 +1,46 @@
+from core.emulator import EmulateX360, EmulatorRegistry, ListOfAllControllers
+from core.utils.hotkeys import Hotkey
+
+
+class RecordingPage:
+    def __init__(self):
+        self.instances = []
+
+    def add_x360_instance(self, instance):
+        self.instances.append(instance)
+
+
+def make_emulator(registry, path):
+    emulator = EmulateX360(path, f"pad {path}", registry.hotkey, backend="null")
+    registry.add_x360_instance(emulator)
+    return emulator
+
+
+def test_attach_skips_emulators_that_shut_down(tmp_path):
+    registry = EmulatorRegistry(Hotkey(str(tmp_path / "hotkeys.json")))
+    gone = make_emulator(registry, "/dev/gone")
+    alive = make_emulator(registry, "/dev/alive")
+    try:
+        gone.shutdown()
+
+        page = RecordingPage()
+        registry.attach(page)
+
+        assert page.instances == [alive]
+        assert list(registry.x360_instances) == ["/dev/alive"]
+    finally:
+        alive.shutdown()
+        gone.shutdown()
+    assert "/dev/alive" not in ListOfAllControllers.controllers_path
+
+
+def test_attached_pages_get_new_emulators(tmp_path):
+    registry = EmulatorRegistry(Hotkey(str(tmp_path / "hotkeys.json")))
+    page = RecordingPage()
+    registry.attach(page)
+
+    emulator = make_emulator(registry, "/dev/new")
+    try:
+        assert page.instances == [emulator]
+    finally:
+        emulator.shutdown()
@@ -0,0 +1,135 @@
+import threading
+import time
+from collections import deque
+
+import pytest
+
+from core import hid_reader
+from core.hid_reader import HIDReader
+
+
+class BlockedRead(Exception):
+    pass
+
+
+class FakeDevice:
+    """
+    hid.device stand-in with cython-hidapi's read() semantics: a timeout
+    of 0 (the default) is a plain hid_read(), which blocks until the next
+    report unless set_nonblocking(1) was called. Such a read raises
+    BlockedRead instead of waiting.
+    """
+
+    def __init__(self, reports=()):
+        self.pending = deque(reports)
+        self.nonblocking = False
+        self.blocking_reads = 0
+        self.closed = False
+
+    def open_path(self, path):
+        pass
+
+    def get_feature_report(self, report_id, size):
+        return []
+
+    def set_nonblocking(self, enabled):
+        self.nonblocking = bool(enabled)
+
+    def read(self, size, timeout_ms=0):
+        if self.pending:
+            return list(self.pending.popleft())
+        if timeout_ms > 0:
+            time.sleep(timeout_ms / 1000)
+            return []
+        if self.nonblocking:
+            return []
+        self.blocking_reads += 1
+        raise BlockedRead("read() would block")
+
+    def close(self):
+        self.closed = True
+
+
+class FakeController:
+    device_path = b"/dev/fake"
+    name = "fake pad"
+
+
+class RecordingReader(HIDReader):
+    def __init__(self, **kwargs):
+        super().__init__(FakeController(), **kwargs)
+        self.reports = []
+        self.errors = []
+        self.finished = threading.Event()
+
+    def _emit_report(self, report):
+        self.reports.append(report)
+
+    def _emit_error(self, message):
+        self.errors.append(message)
+
+    def _emit_finished(self):
+        self.finished.set()
+
+
+@pytest.fixture
+def fake_device(monkeypatch):
+    device = FakeDevice()
+    monkeypatch.setattr(hid_reader.hid, "device", lambda: device)
+    return device
+
+
+def start(reader):
+    thread = threading.Thread(target=reader.run, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_idle_device_does_not_block_the_probe(fake_device):
+    reader = RecordingReader(read_timeout_ms=10)
+    thread = start(reader)
+    time.sleep(0.05)
+
+    reader.stop()
+    thread.join(1.0)
+
+    assert not thread.is_alive()
+    assert fake_device.blocking_reads == 0
+    assert reader.errors == []
+    assert fake_device.closed
+
+
+def test_coalesce_delivers_a_single_pending_report_without_blocking(fake_device):
+    fake_device.pending.append(b"\x01" * 10)
+    reader = RecordingReader(coalesce=True, read_timeout_ms=10)
+    delivered = threading.Event()
+
+    def handler(report):
+        reader.reports.append(report)
+        delivered.set()
+
+    reader.direct_handler = handler
+    thread = start(reader)
+
+    assert delivered.wait(1.0)
+    reader.stop()
+    thread.join(1.0)
+
+    assert reader.reports == [b"\x01" * 10]
+    assert fake_device.blocking_reads == 0
+    assert reader.errors == []
+
+
+def test_coalesce_forwards_only_the_newest_of_a_burst(fake_device):
+    fake_device.pending.extend(bytes([i]) * 10 for i in range(5))
+    reader = RecordingReader(coalesce=True, read_timeout_ms=10)
+    thread = start(reader)
+
+    time.sleep(0.05)
+    reader.stop()
+    thread.join(1.0)
+
+    # the timeout keyword probe forwards the first report on its own
+    assert reader.reports == [b"\x00" * 10, b"\x04" * 10]
+    assert reader.coalesced_reports == 3
+    assert fake_device.blocking_reads == 0
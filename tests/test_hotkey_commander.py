@@ -0,0 +1,61 @@
+import threading
+import time
+
+from core.utils.hotkey_commander import HotkeyExecutor
+
+
+class BlockingCommander:
+    """
+    HotkeyCommander stand-in whose actions wait until released.
+    """
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.calls = []
+
+    def do(self, function, is_custom_command, timeout=None):
+        self.calls.append(function)
+        self.started.set()
+        self.release.wait(5.0)
+        return True, "done"
+
+
+def test_shutdown_with_a_full_queue_does_not_block():
+    commander = BlockingCommander()
+    executor = HotkeyExecutor(commander, max_workers=1, max_queue=2, default_limit=8)
+
+    assert executor.submit("running", is_custom_command=True)
+    assert commander.started.wait(1.0)
+    assert executor.submit("queued 1", is_custom_command=True)
+    assert executor.submit("queued 2", is_custom_command=True)
+    assert not executor.submit("dropped", is_custom_command=True)
+
+    t0 = time.monotonic()
+    executor.shutdown()
+    assert time.monotonic() - t0 < 0.5
+
+    assert not executor.submit("after shutdown", is_custom_command=True)
+
+    commander.release.set()
+    for worker in executor._workers:
+        worker.join(1.0)
+        assert not worker.is_alive()
+    # the queued actions were dropped, only the running one finished
+    assert commander.calls == ["running"]
+    assert executor.completed == 1
+
+
+def test_shutdown_wakes_idle_workers():
+    commander = BlockingCommander()
+    commander.release.set()
+    executor = HotkeyExecutor(commander, max_workers=2)
+
+    assert executor.submit("a", is_custom_command=True)
+    assert executor.submit("b", is_custom_command=True)
+    time.sleep(0.05)
+
+    executor.shutdown(wait=True)
+
+    assert all(not worker.is_alive() for worker in executor._workers)
+    assert executor.completed == 2
@@ -0,0 +1,196 @@
+import json
+import socket
+import time
+
+import pytest
+
+from core.input_frame import pack_v1
+from core.remote_server import UDP_TOKEN_SIZE, RemoteGamepadServer, hash_uuid
+
+
+UUID = "phone-uuid"
+NAME = "phone"
+
+
+class RecordingMapper:
+    def __init__(self):
+        self.states = []
+        self.stopped = 0
+
+    def handle_hid_data(self, state):
+        self.states.append(state)
+
+    def stop(self):
+        self.stopped += 1
+
+    def markers(self):
+        """
+        R2 values of the frames received; the tests use R2 to tag frames.
+        The hello message (input without analog values) is skipped.
+        """
+        return [state["analog"]["R2"] for state in self.states if "R2" in state["analog"]]
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def frame(seq, marker, buttons=0):
+    return pack_v1(seq, 0, buttons, 0, 0, 0, 0, 0, marker)
+
+
+@pytest.fixture
+def server():
+    mappers = []
+
+    def make_mapper(uuid):
+        mapper = RecordingMapper()
+        mappers.append(mapper)
+        return mapper
+
+    srv = RemoteGamepadServer(
+        "127.0.0.1", 0,
+        mapper_factory=make_mapper,
+        trusted_data={NAME: hash_uuid(UUID)},
+        udp_port=0,
+    )
+    srv.start()
+    srv.mappers = mappers
+    yield srv
+    srv.stop()
+
+
+@pytest.fixture
+def client(server):
+    """
+    A trusted client that negotiated v1 frames and is being emulated.
+    Yields (tcp socket, auth_ok reply, mapper, session).
+    """
+    tcp = socket.create_connection(("127.0.0.1", server.port))
+    tcp.settimeout(2.0)
+    tcp.sendall(json.dumps({"uuid": UUID, "name": NAME, "frames": [1]}).encode() + b"\n")
+    reply = json.loads(tcp.makefile("rb").readline())
+    assert reply["type"] == "auth_ok" and reply["frame_version"] == 1
+
+    session = next(iter(server.sessions.values()))
+    server.set_emulating(session.addr, True)
+    yield tcp, reply, server.mappers[0], session
+    tcp.close()
+
+
+def udp_socket(reply, source="127.0.0.1"):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind((source, 0))
+    sock.connect(("127.0.0.1", reply["udp_port"]))
+    return sock
+
+
+def test_udp_frames_reach_the_mapper(client):
+    tcp, reply, mapper, session = client
+    token = bytes.fromhex(reply["udp_token"])
+    assert len(token) == UDP_TOKEN_SIZE
+
+    with udp_socket(reply) as udp:
+        udp.send(token + frame(1, 10))
+        assert wait_for(lambda: mapper.markers() == [10])
+        udp.send(token + frame(2, 20, buttons=1))
+        assert wait_for(lambda: mapper.markers() == [10, 20])
+
+    assert mapper.states[-1]["buttons"]["A"]
+
+
+def test_udp_drops_unknown_token(client):
+    tcp, reply, mapper, session = client
+    token = bytes.fromhex(reply["udp_token"])
+    bad_token = bytes(b ^ 0xFF for b in token)
+
+    with udp_socket(reply) as udp:
+        udp.send(bad_token + frame(1, 66, buttons=1))
+        udp.send(token + frame(2, 20))
+        assert wait_for(lambda: mapper.markers() == [20])
+
+
+def test_udp_drops_other_source_address(client):
+    tcp, reply, mapper, session = client
+    token = bytes.fromhex(reply["udp_token"])
+
+    try:
+        other = udp_socket(reply, source="127.0.0.2")
+    except OSError:
+        pytest.skip("cannot bind a second loopback address")
+    with other, udp_socket(reply) as udp:
+        # right token, wrong host
+        other.send(token + frame(1, 66, buttons=1))
+        time.sleep(0.05)
+        udp.send(token + frame(2, 20))
+        assert wait_for(lambda: mapper.markers() == [20])
+
+
+def test_udp_drops_stale_and_out_of_order_frames(client):
+    tcp, reply, mapper, session = client
+    token = bytes.fromhex(reply["udp_token"])
+
+    with udp_socket(reply) as udp:
+        udp.send(token + frame(100, 10))
+        assert wait_for(lambda: mapper.markers() == [10])
+        udp.send(token + frame(100, 66, buttons=1))  # repeated
+        udp.send(token + frame(99, 67, buttons=2))   # out of order
+        udp.send(token + frame(101, 20))
+        assert wait_for(lambda: mapper.markers() == [10, 20])
+
+    assert session.stale_frames == 2
+
+
+def test_udp_sequence_wraps_around(client):
+    tcp, reply, mapper, session = client
+    token = bytes.fromhex(reply["udp_token"])
+
+    with udp_socket(reply) as udp:
+        udp.send(token + frame(0xFFFF, 10))
+        assert wait_for(lambda: mapper.markers() == [10])
+        udp.send(token + frame(0, 20, buttons=1))    # newer than 0xFFFF
+        assert wait_for(lambda: mapper.markers() == [10, 20])
+        udp.send(token + frame(0xFFFE, 66))          # older than 0
+        udp.send(token + frame(1, 30))
+        assert wait_for(lambda: mapper.markers() == [10, 20, 30])
+
+    assert session.stale_frames == 1
+
+
+def test_tcp_frames_after_negotiation(client):
+    tcp, reply, mapper, session = client
+
+    tcp.sendall(frame(5, 10))
+    assert wait_for(lambda: mapper.markers() == [10])
+    tcp.sendall(frame(4, 66, buttons=1) + frame(6, 20))
+    assert wait_for(lambda: mapper.markers() == [10, 20])
+
+    assert session.stale_frames == 1
+
+
+def test_udp_token_is_revoked_on_disconnect(server, client):
+    tcp, reply, mapper, session = client
+    token = bytes.fromhex(reply["udp_token"])
+
+    tcp.close()
+    assert wait_for(lambda: token not in server.udp_sessions)
+
+
+def test_mapper_is_stopped_on_disconnect(client):
+    tcp, reply, mapper, session = client
+
+    tcp.close()
+    assert wait_for(lambda: mapper.stopped)
+    assert session.mapper is None
+
+
+def test_mapper_is_stopped_on_server_stop(server, client):
+    tcp, reply, mapper, session = client
+
+    server.stop()
+    assert mapper.stopped == 1
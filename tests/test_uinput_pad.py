@@ -0,0 +1,115 @@
+import os
+
+import pytest
+
+from core.uinput_pad import (
+    _EVENT, UInputBackend,
+    EV_SYN, EV_KEY, EV_ABS, SYN_REPORT,
+    BTN_A, ABS_X, ABS_Y, ABS_RY, ABS_Z, ABS_HAT0Y,
+)
+from core.virtual_pad import XUSB_A, XUSB_DPAD_UP
+
+
+@pytest.fixture
+def pipe_pad():
+    r, w = os.pipe()
+    os.set_blocking(r, False)
+    pad = UInputBackend(fd=w)
+    pad.open()
+    yield pad, r
+    pad.close()
+    os.close(r)
+    os.close(w)
+
+
+def read_writes(fd):
+    """
+    Return the events in the pipe as a list of writes (pipes keep writes
+    this small whole), each a list of (type, code, value).
+    """
+    try:
+        data = os.read(fd, 65536)
+    except BlockingIOError:
+        return []
+    events = [event[2:] for event in _EVENT.iter_unpack(data)]
+    writes, current = [], []
+    for event in events:
+        current.append(event)
+        if event == (EV_SYN, SYN_REPORT, 0):
+            writes.append(current)
+            current = []
+    assert not current, "events after the last SYN_REPORT"
+    return writes
+
+
+def test_first_update_writes_full_state_once(pipe_pad):
+    pad, r = pipe_pad
+    pad.update()
+
+    writes = read_writes(r)
+    assert len(writes) == 1
+    assert writes[0][-1] == (EV_SYN, SYN_REPORT, 0)
+    assert (EV_KEY, BTN_A, 0) in writes[0]
+    assert pad.writes == 1
+
+
+def test_update_writes_only_changed_codes(pipe_pad):
+    pad, r = pipe_pad
+    pad.update()
+    read_writes(r)
+
+    pad.press_button(XUSB_A)
+    pad.left_joystick(1000, 0)
+    pad.update()
+
+    assert read_writes(r) == [[
+        (EV_KEY, BTN_A, 1),
+        (EV_ABS, ABS_X, 1000),
+        (EV_SYN, SYN_REPORT, 0),
+    ]]
+    assert pad.writes == 2
+
+
+def test_update_without_changes_writes_nothing(pipe_pad):
+    pad, r = pipe_pad
+    pad.left_trigger(200)
+    pad.update()
+    read_writes(r)
+
+    pad.left_trigger(200)
+    pad.update()
+
+    assert read_writes(r) == []
+    assert pad.writes == 1
+
+
+def test_y_axes_are_flipped(pipe_pad):
+    pad, r = pipe_pad
+    pad.update()
+    read_writes(r)
+
+    pad.left_joystick(0, 12000)
+    pad.right_joystick(0, -32768)
+    pad.update()
+
+    events = read_writes(r)[0]
+    assert (EV_ABS, ABS_Y, -12000) in events
+    # -(-32768) does not fit in the axis range
+    assert (EV_ABS, ABS_RY, 32767) in events
+
+
+def test_dpad_and_trigger_events(pipe_pad):
+    pad, r = pipe_pad
+    pad.update()
+    read_writes(r)
+
+    pad.press_button(XUSB_DPAD_UP)
+    pad.right_trigger(0)
+    pad.left_trigger(255)
+    pad.update()
+
+    assert read_writes(r) == [[
+        (EV_ABS, ABS_Z, 255),
+        (EV_ABS, ABS_HAT0Y, -1),
+        (EV_SYN, SYN_REPORT, 0),
+    ]]
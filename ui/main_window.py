@@ -15,13 +15,10 @@ from PySide6.QtCore import Qt
 from PySide6.QtGui import QIcon, QAction
 
 from ui.theme_manager import ThemeManager
-from ui.pages.controller_emulation import ControllerEmulation
-from ui.pages.controllers import ControllersPage
-from ui.pages.settings import SettingsPage
-from ui.pages.server import ServerPage
-from ui.pages.hotkey import HotkeyPage
+from core.emulator import EmulatorRegistry
 from core.settings import SettingsManager
 
+from core.utils import startup_timer
 from core.utils.hotkeys import Hotkey
 
 class MainWindow(QMainWindow):
@@ -98,22 +95,25 @@ class MainWindow(QMainWindow):
         left_column.addWidget(self.menu)
         left_column.addStretch()
 
-        # Pages
+        # Pages are built the first time they are selected; until then
+        # their slot in the stack holds an empty placeholder. Mappers
+        # register emulators with these registries, which hand them to the
+        # Hotkeys / Test XInput pages once those exist.
         self.pages = QStackedWidget()
+        self.controllers_registry = EmulatorRegistry(self.hotkey)
+        self.hotkey_registry = EmulatorRegistry(self.hotkey)
 
-        controllers_page = ControllersPage()
-        hotkey_page = HotkeyPage(self.hotkey)
         # The order here must match indices 0..4
-        # 0: Controller Emulation
-        self.pages.addWidget(ControllerEmulation(self.settings, controllers_page, hotkey_page))
-        # 1: Remote Gamepad (server page)
-        self.pages.addWidget(ServerPage(self.settings, controllers_page, hotkey_page))
-        # 2: Hotkeys page
-        self.pages.addWidget(hotkey_page)
-        # 3: Test XInput
-        self.pages.addWidget(controllers_page)
-        # 4: Settings
-        self.pages.addWidget(SettingsPage(self.theme_manager, self.settings))
+        self._page_factories = {
+            self.IDX_CONTROLLER_EMULATION: self._build_controller_emulation,
+            self.IDX_REMOTE_GAMEPAD: self._build_server,
+            self.IDX_HOTKEY: self._build_hotkey,
+            self.IDX_TEST_XINPUT: self._build_controllers,
+            self.IDX_SETTINGS: self._build_settings,
+        }
+        self._built_pages = {}
+        for _ in self._page_factories:
+            self.pages.addWidget(QWidget())
 
         main_layout.addLayout(left_column)
         main_layout.addWidget(self.pages, 1)
@@ -138,8 +138,51 @@ class MainWindow(QMainWindow):
             return
 
         # For all other indices, show corresponding page (indices 0..4)
-        if 0 <= index < self.pages.count():
-            self.pages.setCurrentIndex(index)
+        if index in self._page_factories:
+            self.pages.setCurrentWidget(self.page(index))
+
+    # --------------------
+    # Pages
+    # --------------------
+
+    def page(self, index: int) -> QWidget:
+        """
+        Return the page at `index`, building it on first use.
+        """
+        page = self._built_pages.get(index)
+        if page is None:
+            label = f"build page: {self.menu.item(index).text()}"
+            page = startup_timer.timed(label, self._page_factories[index])
+            placeholder = self.pages.widget(index)
+            self.pages.removeWidget(placeholder)
+            placeholder.deleteLater()
+            self.pages.insertWidget(index, page)
+            self._built_pages[index] = page
+        return page
+
+    def _build_controller_emulation(self) -> QWidget:
+        from ui.pages.controller_emulation import ControllerEmulation
+        return ControllerEmulation(self.settings, self.controllers_registry, self.hotkey_registry)
+
+    def _build_server(self) -> QWidget:
+        from ui.pages.server import ServerPage
+        return ServerPage(self.settings, self.controllers_registry, self.hotkey_registry)
+
+    def _build_hotkey(self) -> QWidget:
+        from ui.pages.hotkey import HotkeyPage
+        page = HotkeyPage(self.hotkey)
+        self.hotkey_registry.attach(page)
+        return page
+
+    def _build_controllers(self) -> QWidget:
+        from ui.pages.controllers import ControllersPage
+        page = ControllersPage()
+        self.controllers_registry.attach(page)
+        return page
+
+    def _build_settings(self) -> QWidget:
+        from ui.pages.settings import SettingsPage
+        return SettingsPage(self.theme_manager, self.settings)
 
     # --------------------
     # Tray
@@ -8,11 +8,21 @@ from PySide6.QtCore import Qt, Signal
 
 from ui.pages.modal.add_controller import AddControllerDialog
 from core import emulator
+from core.controller import controller_type
 from core.mapper import Mapper
 from core.settings import SettingsManager
 from core.hid import HIDManager
 from core import hid
 
+
+# profile (core.controller.controller_type) -> name in the add-controller dialog
+DISPLAY_NAMES = {
+    "Dualshock4": "Dualshock4 (PS4 Controller)",
+    "DualSense": "Dualsense (PS5 Controller)",
+    "Unojoy": "UnoJoy Controller (Arduino)",
+}
+
+
 class EmuListItemWidget(QWidget):
     emulate_requested = Signal(str, str, object)
     delete_requested = Signal(object)
@@ -77,7 +87,12 @@ class ControllerEmulation(QWidget):
         super().__init__()
         layout_dashboard = QVBoxLayout(self)
         self.controllers_page = controllers_page
-        hid.hid_manager = HIDManager(settings.get_polling_rate() / 1000)
+        hid.hid_manager = HIDManager(
+            settings.get_polling_rate() / 1000,
+            coalesce=settings.get_coalesce_reports(),
+            direct=settings.get_direct_pipeline(),
+            input_backend=settings.get_input_backend(),
+        )
         self.hotkey_page = hotkey_page
         self.mappers: dict = {}
         self.settings = settings
@@ -147,17 +162,9 @@ class ControllerEmulation(QWidget):
                 except Exception:
                     pid_int = None
 
-            if vid_int == 0x054C and pid_int in (0x05C4, 0x09CC):
-                name = "Dualshock4 (PS4 Controller)"
-            elif vid_int == 0x054C and pid_int == 0x0CE6:
-                name = "Dualsense (PS5 Controller)"
-            elif vid_int == 0x10C4 and pid_int == 0x82C0:
-                name = "UnoJoy Controller (Arduino)"
-            else:
-                name = "Not Supported"
-            
             # --- Skip unsupported devices entirely ---
-            if name == "Not Supported":
+            name = DISPLAY_NAMES.get(controller_type(vid_int, pid_int))
+            if name is None:
                 continue
             
             count = name_counts.get(name, 0)
@@ -299,62 +306,46 @@ class ControllerEmulation(QWidget):
                 except Exception:
                     pid_int = None
 
-            if vid_int == 0x054C and pid_int in (0x05C4, 0x09CC):
-                controller_type = "Dualshock4"
-            elif vid_int == 0x054C and pid_int == 0x0CE6:
-                controller_type = "Dualsense"
-            elif vid_int == 0x10C4 and pid_int == 0x82C0:
-                controller_type = "Unojoy"
-            else:
-                controller_type = "Generic"
+            # same table as the headless daemon
+            profile = controller_type(vid_int, pid_int)
 
-            mapper = Mapper(controller, controller_type, "x360", self.settings, self.controllers_page, self.hotkey_page)
+            mapper = Mapper(controller, profile, "x360", self.settings, self.controllers_page, self.hotkey_page)
             self.mappers[path] = mapper
 
-            wtuple = getattr(hid.hid_manager, "_workers", {}).get(path)
-            if wtuple:
-                _, worker, _ = wtuple
-                if worker:
-                    try:
-                        worker.data_received.connect(mapper.handle_hid_data)
-                        worker.error.connect(mapper.handle_error)
-                    except RuntimeError:
-                        print(f"[Warning] Worker for {path} was deleted before connecting signals")
+            try:
+                hid.hid_manager.attach(
+                    path,
+                    mapper.handle_hid_data,
+                    mapper.handle_error,
+                    edge_key=mapper.decoder.button_state,
+                )
+            except RuntimeError:
+                print(f"[Warning] Worker for {path} was deleted before connecting signals")
             print(emulator.ListOfAllControllers.controllers_name)
             print(emulator.ListOfAllControllers.controllers_path)
             mapper.start()
 
         else:
-            if path in self.mappers:
-                mapper = self.mappers[path]
-                try:
-                    mapper.stop()
-                except Exception:
-                    pass
-
+            mapper = self.mappers.pop(path, None)
+            if mapper is not None:
                 try:
-                    wtuple = getattr(hid.hid_manager, "_workers", {}).get(path)
-                    if wtuple:
-                        _, worker, _ = wtuple
-                        if worker:
-                            try:
-                                worker.data_received.disconnect(mapper.handle_hid_data)
-                            except Exception:
-                                pass
-                            try:
-                                worker.error.disconnect(mapper.handle_error)
-                            except Exception:
-                                pass
+                    hid.hid_manager.detach(path, mapper.handle_hid_data, mapper.handle_error)
                 except Exception:
                     pass
 
-                del self.mappers[path]
-
+            # stop (and join) the reader before the mapper, so in direct mode
+            # no report is still being mapped while the emulator shuts down
             try:
                 hid.hid_manager.stop_polling(path)
             except Exception:
                 pass
 
+            if mapper is not None:
+                try:
+                    mapper.stop()
+                except Exception:
+                    pass
+
     def _on_delete_requested(self, widget: EmuListItemWidget, item: QListWidgetItem):
         stored = item.data(Qt.UserRole) or (None, None, None)
         device = stored[0]
@@ -362,17 +353,17 @@ class ControllerEmulation(QWidget):
 
         if device:
             path = device.get("path")
+            try:
+                hid.hid_manager.stop_polling(path)
+            except Exception:
+                pass
+
             if path in self.mappers:
                 try:
                     self.mappers[path].stop()
                 except Exception:
                     pass
                 del self.mappers[path]
-                
-            try:
-                hid.hid_manager.stop_polling(path)
-            except Exception:
-                pass
 
         for i in range(self.emu_list.count()):
             if self.emu_list.item(i) is item:
@@ -382,11 +373,11 @@ class ControllerEmulation(QWidget):
     def closeEvent(self, event):
         for path, mapper in list(self.mappers.items()):
             try:
-                mapper.stop()
+                hid.hid_manager.stop_polling(path)
             except Exception:
                 pass
             try:
-                hid.hid_manager.stop_polling(path)
+                mapper.stop()
             except Exception:
                 pass
             del self.mappers[path]
@@ -1,69 +1,24 @@
-import sys
-import socket
-import json
-import threading
-import hashlib
-import random
-import os
-from typing import Optional, Dict, Tuple
+from typing import Optional, Dict
 from core.settings import SettingsManager
 
 from PySide6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QLabel, QPushButton,
     QListWidget, QListWidgetItem, QHBoxLayout, QSizePolicy, QMessageBox
 )
-from PySide6.QtCore import Qt, Signal, QObject, QSize, QTimer
+from PySide6.QtCore import Qt, Signal, QObject, QSize
 
 from core.mapper import Phone_mapper
-
-
-HOST = "0.0.0.0"
-PORT = 5000
-TRUSTED_FILE = "trusted_clients.json"
-
-
-# ---------------------------------------------------------
-
-def get_local_ip():
-    try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect(("8.8.8.8", 80))
-        ip = s.getsockname()[0]
-        s.close()
-    except Exception:
-        ip = "Unavailable"
-    return f"{ip}:{PORT}"
-
-
-def hash_uuid(uuid_str: str) -> str:
-    return hashlib.sha256(uuid_str.encode("utf-8")).hexdigest()
-
-
-def load_trusted() -> dict:
-    if os.path.exists(TRUSTED_FILE):
-        try:
-            with open(TRUSTED_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            pass
-    return {}
-
-
-def save_trusted(trusted_data: dict):
-    with open(TRUSTED_FILE, "w", encoding="utf-8") as f:
-        json.dump(trusted_data, f, indent=4)
+from core.remote_server import (
+    HOST, PORT, UDP_PORT, TRUSTED_FILE,
+    EVENT_CONNECTED, EVENT_DISCONNECTED, EVENT_UUID_UPDATED,
+    EVENT_AUTH_CODE, EVENT_TRUSTED_ADDED,
+    RemoteGamepadServer, get_local_ip, hash_uuid, load_trusted, save_trusted,
+)
 
 
 class ServerSignals(QObject):
-    log_message = Signal(str)
-    client_connected = Signal(tuple)            # addr
-    client_disconnected = Signal(tuple)         # addr
-    client_uuid_updated = Signal(tuple, str)    # addr, uuid
-
-    # Now we send addr + code + time_left for UI per client
-    show_auth_code = Signal(tuple, str, int)    # addr, code, time_left
-
-    trusted_client_added = Signal(str)          # name
+    # batches of RemoteGamepadServer events, (kind, *args) each
+    events = Signal(list)
 
 
 class TrustedItemWidget(QWidget):
@@ -209,22 +164,15 @@ class ServerPage(QWidget):
         self.setWindowTitle("Server Control")
         self.setMinimumSize(700, 600)
 
-        self.server_socket: Optional[socket.socket] = None
-        self.server_thread: Optional[threading.Thread] = None
+        self.server: Optional[RemoteGamepadServer] = None
         self.server_running = False
-        self.stop_event = threading.Event()
         self.signals = ServerSignals()
         self.settings = settings
         self.controllers_page = controllers_page
         self.hotkey_page = hotkey_page
 
-        # conn_key -> (conn, addr, uuid)
-        self.clients: Dict[tuple, Tuple[socket.socket, tuple, str]] = {}
-        # conn_key -> bool
-        self.emulation_states: Dict[tuple, bool] = {}
-
-        # conn_key -> {"code": str, "time_left": int, "authenticated": bool, "expired": bool}
-        self.auth_states: Dict[tuple, Dict[str, object]] = {}
+        # conn_key (addr) -> uuid, for connected clients
+        self.clients: Dict[tuple, str] = {}
 
         self.trusted_data = load_trusted()
 
@@ -332,20 +280,11 @@ class ServerPage(QWidget):
 
 
         # Connect signals
-        self.signals.client_connected.connect(self._on_client_connected_ui)
-        self.signals.client_disconnected.connect(self._on_client_disconnected_ui)
-        self.signals.client_uuid_updated.connect(self._on_client_uuid_updated_ui)
-        self.signals.show_auth_code.connect(self._on_show_auth_code_ui)
-        self.signals.trusted_client_added.connect(self._on_trusted_client_added_ui)
+        self.signals.events.connect(self._on_server_events)
 
         # Populate trusted list
         self.refresh_trusted_ui()
 
-        # NEW: global timer to update auth countdowns every second
-        self.auth_timer = QTimer(self)
-        self.auth_timer.timeout.connect(self._on_auth_timer_tick)
-        self.auth_timer.start(1000)  # 1 second
-
     # ---------- Trusted List UI ----------
 
     def refresh_trusted_ui(self):
@@ -381,241 +320,51 @@ class ServerPage(QWidget):
     def _on_trusted_client_added_ui(self, name: str):
         self.refresh_trusted_ui()
 
-    # ---------- Auth timer tick ----------
-
-    def _on_auth_timer_tick(self):
-        """Update auth countdowns for all clients every second."""
-        to_expire = []
-
-        for conn_key, state in list(self.auth_states.items()):
-            # Skip already authenticated or already expired
-            if state.get("authenticated") or state.get("expired"):
-                continue
-
-            code = state.get("code")
-            time_left = state.get("time_left", 0)
-
-            if code is None:
-                continue
-
-            if time_left > 0:
-                time_left -= 1
-                state["time_left"] = time_left
-
-            # Update UI
-            self.signals.show_auth_code.emit(conn_key, code, time_left)
-
-            if time_left <= 0:
-                # Expired: mark and remember to close connection
-                state["expired"] = True
-                to_expire.append(conn_key)
-
-        # Close expired connections and clear UI
-        for conn_key in to_expire:
-            conn_tuple = self.clients.get(conn_key)
-            if conn_tuple:
-                try:
-                    conn_tuple[0].close()
-                except OSError:
-                    pass
-            # Clear auth UI
-            self.signals.show_auth_code.emit(conn_key, "", 0)
-
-    # ---------- Networking / Client Handling ----------
-
-    def _handle_client(self, conn: socket.socket, addr: tuple):
-        conn_key = addr
-        buffer = ""
-        uuid = "unknown"
-
-        authenticated = False
-        auth_code_generated: Optional[str] = None
-        auth_time_left = 120  # seconds
-
-        self.clients[conn_key] = (conn, addr, uuid)
-        self.emulation_states.setdefault(conn_key, False)
-
-        # Initialize auth state
-        self.auth_states[conn_key] = {
-            "code": None,
-            "time_left": auth_time_left,
-            "authenticated": False,
-            "expired": False,
-        }
-
-        self.signals.client_connected.emit(addr)
-
-        mapper: Optional[Phone_mapper] = None
-
-        try:
-            while not self.stop_event.is_set():
-                # If auth expired server-side, break loop
-                if self.auth_states.get(conn_key, {}).get("expired"):
-                    break
-
-                try:
-                    data = conn.recv(1024)
-                except ConnectionResetError:
-                    break
-                except OSError:
-                    break
-
-                if not data:
-                    break
-
-                buffer += data.decode("utf-8", errors="replace")
-
-                while "\n" in buffer:
-                    line, buffer = buffer.split("\n", 1)
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        msg = json.loads(line)
-
-                        client_uuid = msg.get("uuid", "unknown")
-                        client_name = msg.get("name", "UnknownDevice")
-
-                        if client_uuid != "unknown" and client_uuid != uuid:
-                            uuid = client_uuid
-                            self.clients[conn_key] = (conn, addr, uuid)
-                            self.signals.client_uuid_updated.emit(addr, uuid)
-
-                        # If auth expired, ignore any further auth attempts and break
-                        if self.auth_states.get(conn_key, {}).get("expired"):
-                            break
-
-                        if not authenticated:
-                            hashed_id = hash_uuid(uuid)
-                            if (
-                                client_name in self.trusted_data
-                                and self.trusted_data[client_name] == hashed_id
-                            ):
-                                # Already trusted
-                                authenticated = True
-                                self.auth_states[conn_key]["authenticated"] = True
-
-                                # Clear any auth code in UI
-                                self.signals.show_auth_code.emit(addr, "", 0)
-
-                                mapper = Phone_mapper(uuid, "x360", self.controllers_page,self.hotkey_page, self.settings)
-                            else:
-                                received_code = msg.get("auth_code")
-                                if received_code:
-                                    if (
-                                        auth_code_generated
-                                        and str(received_code) == auth_code_generated
-                                    ):
-                                        # Auth succeeded
-                                        authenticated = True
-                                        self.auth_states[conn_key]["authenticated"] = True
-
-                                        self.trusted_data[client_name] = hashed_id
-                                        save_trusted(self.trusted_data)
-                                        self.signals.trusted_client_added.emit(
-                                            client_name
-                                        )
-
-                                        # Auth succeeded -> clear auth code & timer in UI
-                                        self.signals.show_auth_code.emit(addr, "", 0)
-
-                                        mapper = Phone_mapper(
-                                            uuid, "x360", self.controllers_page, self.hotkey_page, self.settings
-                                        )
-                                    else:
-                                        print(f"[{addr}] Invalid auth code: {received_code}")
-                                else:
-                                    # No auth_code received yet: generate once and show
-                                    if not auth_code_generated:
-                                        auth_code_generated = str(
-                                            random.randint(1000, 9999)
-                                        )
-                                        auth_time_left = 120
-                                        st = self.auth_states.get(conn_key, {})
-                                        st["code"] = auth_code_generated
-                                        st["time_left"] = auth_time_left
-
-                                        # Initial display
-                                        self.signals.show_auth_code.emit(
-                                            addr,
-                                            auth_code_generated,
-                                            auth_time_left,
-                                        )
-
-                                # Skip HID processing until authenticated
-                                continue
-
-                        # If we reach here and expired in the meantime, stop
-                        if self.auth_states.get(conn_key, {}).get("expired"):
-                            break
-
-                        if authenticated and mapper:
-                            buttons = msg.get("buttons", {})
-                            analog = msg.get("analog", {})
-                            joystick = msg.get("joystick", {})
-
-                            if self.emulation_states.get(conn_key, False):
-                                mapper.handle_hid_data(
-                                    {
-                                        "buttons": buttons,
-                                        "analog": analog,
-                                        "joystick": joystick,
-                                    }
-                                )
-
-                    except json.JSONDecodeError:
-                        # Ignore malformed messages
-                        continue
-        finally:
-            try:
-                conn.close()
-            except OSError:
-                pass
-
-            if conn_key in self.clients:
-                del self.clients[conn_key]
-            if conn_key in self.emulation_states:
-                del self.emulation_states[conn_key]
-            if conn_key in self.auth_states:
-                del self.auth_states[conn_key]
-
-            self.signals.client_disconnected.emit(addr)
-
-    def _server_loop(self):
-        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self.server_socket.bind((HOST, PORT))
-        self.server_socket.listen()
-        self.server_socket.settimeout(0.5)
-
-        try:
-            while not self.stop_event.is_set():
-                try:
-                    conn, addr = self.server_socket.accept()
-                    t = threading.Thread(
-                        target=self._handle_client, args=(conn, addr), daemon=True
-                    )
-                    t.start()
-                except socket.timeout:
-                    continue
-                except OSError:
-                    # socket closed while stopping
-                    break
-        finally:
-            if self.server_socket:
-                try:
-                    self.server_socket.close()
-                except OSError:
-                    pass
-                self.server_socket = None
+    # ---------- Server events ----------
+
+    def _on_server_events(self, events: list):
+        """Apply a batch of server events on the GUI thread."""
+        for kind, *args in events:
+            if kind == EVENT_CONNECTED:
+                self._on_client_connected_ui(*args)
+            elif kind == EVENT_DISCONNECTED:
+                self._on_client_disconnected_ui(*args)
+            elif kind == EVENT_UUID_UPDATED:
+                self._on_client_uuid_updated_ui(*args)
+            elif kind == EVENT_AUTH_CODE:
+                self._on_show_auth_code_ui(*args)
+            elif kind == EVENT_TRUSTED_ADDED:
+                self._on_trusted_client_added_ui(*args)
+
+    # ---------- Networking ----------
+
+    def _make_mapper(self, uuid: str) -> Phone_mapper:
+        return Phone_mapper(uuid, "x360", self.controllers_page, self.hotkey_page, self.settings)
+
+    def _stop_server(self):
+        if self.server is not None:
+            self.server.stop()
+            self.server = None
+        self.clients.clear()
+        self.clients_list.clear()
+        self.server_running = False
 
     def toggle_server(self):
         if not self.server_running:
-            self.stop_event.clear()
-            self.server_thread = threading.Thread(
-                target=self._server_loop, daemon=True
+            self.server = RemoteGamepadServer(
+                HOST,
+                PORT,
+                mapper_factory=self._make_mapper,
+                on_events=self.signals.events.emit,
+                trusted_data=self.trusted_data,
+                udp_port=UDP_PORT,
             )
-            self.server_thread.start()
+            try:
+                self.server.start()
+            except OSError as e:
+                self.server = None
+                QMessageBox.warning(self, "Server Error", f"Could not start server: {e}")
+                return
             self.server_running = True
 
             self.button.setText("Stop Server")
@@ -624,25 +373,7 @@ class ServerPage(QWidget):
             self.button.style().polish(self.button)
 
         else:
-            self.stop_event.set()
-            if self.server_socket:
-                try:
-                    self.server_socket.close()
-                except OSError:
-                    pass
-
-            for conn_key, (conn, addr, _) in list(self.clients.items()):
-                try:
-                    conn.close()
-                except OSError:
-                    pass
-
-            self.clients.clear()
-            self.emulation_states.clear()
-            self.auth_states.clear()
-            self.clients_list.clear()
-
-            self.server_running = False
+            self._stop_server()
 
             self.button.setText("Start Server")
             self.button.setProperty("running", False)
@@ -661,6 +392,7 @@ class ServerPage(QWidget):
 
     def _on_client_connected_ui(self, addr: tuple):
         conn_key = addr
+        self.clients[conn_key] = "unknown"
         item = QListWidgetItem(self.clients_list)
         widget = ClientListItemWidget(conn_key, f"{addr[0]}:{addr[1]}")
         sh = widget.sizeHint()
@@ -673,6 +405,7 @@ class ServerPage(QWidget):
         widget.delete_requested.connect(self._on_delete_requested)
 
     def _on_client_disconnected_ui(self, addr: tuple):
+        self.clients.pop(addr, None)
         item = self._find_item_by_conn_key(addr)
         if item:
             row = self.clients_list.row(item)
@@ -680,6 +413,8 @@ class ServerPage(QWidget):
                 self.clients_list.takeItem(row)
 
     def _on_client_uuid_updated_ui(self, addr: tuple, uuid: str):
+        if addr in self.clients:
+            self.clients[addr] = uuid
         item = self._find_item_by_conn_key(addr)
         if item:
             widget = self.clients_list.itemWidget(item)
@@ -704,32 +439,17 @@ class ServerPage(QWidget):
                 widget.set_running(False)
             return
 
-        if isinstance(widget, ClientListItemWidget):
-            self.emulation_states[conn_key] = widget.is_running()
+        if isinstance(widget, ClientListItemWidget) and self.server is not None:
+            self.server.set_emulating(conn_key, widget.is_running())
 
     def _on_delete_requested(self, conn_key):
-        conn_tuple = self.clients.get(conn_key)
-        if conn_tuple:
-            try:
-                conn_tuple[0].close()
-            except OSError:
-                pass
-        self.emulation_states.pop(conn_key, None)
-        self.auth_states.pop(conn_key, None)
+        if self.server is not None:
+            self.server.set_emulating(conn_key, False)
+            self.server.disconnect(conn_key)
 
     # ---------- Window Closing ----------
 
     def closeEvent(self, event):
         if self.server_running:
-            self.stop_event.set()
-            if self.server_socket:
-                try:
-                    self.server_socket.close()
-                except OSError:
-                    pass
-            for conn_key, (conn, _, _) in list(self.clients.items()):
-                try:
-                    conn.close()
-                except OSError:
-                    pass
+            self._stop_server()
         event.accept()